@@ -1,14 +1,32 @@
+import math
+import os
+import time
+import itertools
+import concurrent.futures
 from game.settings import *
-from mpi4py import MPI
-
-COMM = MPI.COMM_WORLD
-SIZE = COMM.Get_size()
-
+from game.backend import SERIAL
+from game import bitboard
+from game.position import Position
+from game.endgame import EndgameSolver, DEFAULT_ENDGAME_EMPTIES, DISC_SCORE, WLD_EXTRA_EMPTIES
+from game.evaluation import make_evaluator
+from game.ordering import MoveOrdering
+from game.table import TranspositionTable, DEFAULT_TABLE_SIZE, EXACT, LOWER, UPPER
+
+# Width of the null window of the scout searches. The evaluations change in steps of at least
+# 1/800 (terms) or 1 (table) between positions, so no score falls inside the window.
+NULL_WINDOW = 1.0e-6
 
 class AlphaBetaPruner(object):
-    """Alpha-Beta Pruning with pvsplit algorithm."""
+    """Principal variation search with the pvsplit algorithm.
 
-    def __init__(self, mutex, max_depth, pieces, first_player):
+    The search is a negamax: every score is for the player to move in the position
+    it belongs to. The first move of a position is searched with the full window and
+    the other moves with a null window, they are only searched again with the full
+    window when they turn out to be better than the first.
+    """
+
+    def __init__(self, mutex, max_depth, pieces, first_player, table=None, movetime=None, backend=None,
+                 state=None, endgame_empties=DEFAULT_ENDGAME_EMPTIES, stats=None, evaluator=None):
         self.mutex = mutex
         self.board = 0
         self.move = 1
@@ -18,177 +36,457 @@ class AlphaBetaPruner(object):
         self.infinity = 1.0e400
         self.first_player, self.second_player = (WHITE_ID, BLACK_ID) \
             if first_player == WHITE else (BLACK_ID, WHITE_ID)
-        self.state = self.make_state(pieces)
+        self.state = state if state is not None else self.make_state(pieces) if pieces is not None else None
+        self.table = table if table is not None else TranspositionTable()
+        self.movetime = movetime
+        self.deadline = None
+        self.task = None
+        self.task_ids = itertools.count()
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self.stats = stats
+        self.pv = []
+        self.ordering = MoveOrdering()
+        self.evaluator = evaluator if evaluator is not None else make_evaluator()
+        self.evaluate = self.evaluator.evaluate
+        self.backend = backend if backend is not None else SERIAL
+        self.stop_event = None
+        self.endgame_empties = endgame_empties
+        self.endgame = EndgameSolver(self.check_interrupt)
+        self.split = self.backend.splitter(self)
 
     def make_state(self, pieces):
         """ 
-        Returns a tuple in the form of "current_state", that is: (current_player, state).
+        Returns a tuple in the form of "current_state", that is: (current_player, own, opp),
+        where own and opp are the bitboards of the current player and its opponent.
+        """
+        return AlphaBetaPruner.pieces_state(pieces, self.first_player)
+
+    @staticmethod
+    def pieces_state(pieces, player):
+        """ 
+        Returns the "current_state" tuple of the pieces with 'player' (an id) to move.
         """
         results = {BOARD: BOARD_ID, MOVE: BOARD_ID, WHITE: WHITE_ID, BLACK: BLACK_ID}
-        return self.first_player, [results[p.get_state()] for p in pieces]
+        state = [results[p.get_state()] for p in pieces]
+        own, opp = bitboard.from_list(state, player, AlphaBetaPruner.opponent(player))
+        return player, own, opp
+
+    def make_position(self, current_state, key=None):
+        """ Returns a Position of the state, prepared for the evaluator.
+        """
+        position = Position(current_state, key)
+        self.evaluator.attach(position)
+        return position
 
     def run(self):
-        return self.pvsplit(current_state=self.state, depth=0, alpha=-self.infinity, beta=self.infinity, action=None)[1]
+        table = self.table.stats() if self.stats is not None else None
+        position = self.make_position(self.state)
+        action = None
+        if position.empties <= self.endgame_empties:
+            action = self.solve_endgame(position)
+            self.add_ply(position.empties)
+        elif self.endgame_empties and position.empties <= self.endgame_empties + WLD_EXTRA_EMPTIES:
+            action = self.solve_win_loss_draw(position)
+            if action is not None:
+                self.add_ply(position.empties)
+
+        if action is None and self.movetime is not None:
+            action = self.iterative_deepening()
+        elif action is None:
+            action = self.pvsplit(position=position, depth=0, alpha=-self.infinity, beta=self.infinity,
+                                  action=None)[1]
+            self.add_ply(self.max_depth)
+
+        if self.stats is not None:
+            self.stats.add_table(table, self.table.stats())
+            self.stats.finish(bitboard.to_coordinates(action), self.nodes, self.cutoffs, self.first_cutoffs)
+        return bitboard.to_coordinates(action)
+
+    def add_ply(self, depth):
+        """ Records a completed search of 'depth' in the statistics, when they are collected.
+        """
+        if self.stats is not None:
+            self.stats.add_ply(depth, self.nodes, self.cutoffs, self.first_cutoffs)
 
-    def pvsplit(self, current_state, depth, alpha, beta, action):
-        actions = AlphaBetaPruner.actions(current_state)
+    def iterative_deepening(self):
+        """ Searches one ply deeper at a time until 'movetime' seconds have passed or
+            'max_depth' has been searched, and returns the move of the deepest completed search.
 
-        if (self.is_leaf(depth) or not actions) and action:
-            return AlphaBetaPruner.evaluation(current_state, AlphaBetaPruner.opponent(current_state[0])), action
+            The principal variation of every completed search is searched first by the next one.
+        """
+        start = time.time()
+        position = self.make_position(self.state)
+        last_depth = self.max_depth
+        best_action = None
+
+        for max_depth in range(0, last_depth + 1):
+            self.max_depth = max_depth
+            try:
+                best_action = self.pvsplit(position=position, depth=0,
+                                           alpha=-self.infinity, beta=self.infinity, action=None)[1]
+            except SearchTimeout:
+                break
+
+            self.pv = self.principal_variation(position, best_action)
+            self.add_ply(max_depth)
+            # The first iteration always completes so that there is a move to return.
+            self.deadline = start + self.movetime
+            if time.time() >= self.deadline:
+                break
+
+        self.max_depth = last_depth
+        self.deadline = None
+        return best_action
+
+    def principal_variation(self, position, action):
+        """ Returns the list of moves expected to be played from the position,
+            starting with 'action' and followed by the best moves in the transposition table.
+        """
+        pv = []
+        while action is not None and len(pv) <= self.max_depth:
+            pv.append(action)
+            position.make(action)
+            entry = self.table.probe(position.key)
+            if entry is None or entry[4] not in position.actions():
+                break
+            action = entry[4]
+
+        for _ in pv:
+            position.unmake()
+        return pv
+
+    def pvsplit(self, position, depth, alpha, beta, action):
+        """ Returns a (score, action) tuple for the player to move. The first move is searched
+            before the others, which are then searched by the split of the backend.
+        """
+        actions = position.actions()
 
-        next_action = actions[0]
-        next_state = AlphaBetaPruner.next_state(current_state, next_action)
+        if position.empties <= self.endgame_empties and action is not None:
+            return self.endgame_score(position, position.key, alpha, beta), action
+
+        if (self.is_leaf(depth) or not actions) and action is not None:
+            return self.evaluate(position), action
 
-        score, action = self.pvsplit(next_state, depth + 1, alpha, beta, next_action)
+        key = position.key
+        entry = self.table.probe(key)
+        first = self.pv[depth] if depth < len(self.pv) else entry[4] if entry is not None else None
+        self.ordering.order(actions, depth, position.player, first)
 
-        if score > beta:
+        next_action = actions[0]
+        position.make(next_action)
+        score = -self.pvsplit(position, depth + 1, -beta, -alpha, next_action)[0]
+        position.unmake()
+
+        if score >= beta:
+            self.cutoffs += 1
+            self.first_cutoffs += 1
+            self.ordering.cutoff(next_action, depth, self.max_depth - depth, position.player)
             return beta, next_action
         if score > alpha:
             alpha = score
 
-        # parallel
-        current_rank = 1
-        total_task_nr = len(actions[1:])
-        task_distribution = {}
-
-        for order, action_ in enumerate(actions[1:]):
-            next_state = AlphaBetaPruner.next_state(current_state, action_)
-            if SIZE > 1:
-                """
-                Multi threaded
-                Sending data
-                """
-                data = {
-                    'next_state': next_state,
-                    'depth': depth+1,
-                    'max_depth': self.max_depth,
-                    'alpha': alpha,
-                    'beta': beta,
-                    'order': order
-                }
-                COMM.isend(data, dest=current_rank, tag=1)
-                task_distribution[order] = {
-                    'rank': current_rank,
-                    'data': data,
-                    'action': action_,
-                    'score': None
-                }
-                current_rank = current_rank+1 if current_rank+1 < SIZE else 1
-            else:
-                """ Single threaded """
-                score = AlphaBetaPruner.alpha_beta(next_state, depth+1, self.max_depth, alpha, beta)
-
-                if score > beta:
-                    return beta, action_
-
-                if score > alpha:
-                    alpha = score
-                    next_action = action_
-
-        if SIZE > 1:
-            """
-            Multi threaded 
-            Receiving data
-            """
-            for _ in range(0, total_task_nr):
-                req = COMM.irecv(tag=1)
-                response = req.wait()
-                task_distribution[response[0]]['score'] = response[1]
-
-            for key, value in task_distribution.items():
-                score = value['score']
-                action_ = value['action']
-                if score > beta:
-                    return beta, action_
-
-                if score > alpha:
-                    alpha = score
-                    next_action = action_
+        score, next_action = self.split(position, actions[1:], depth, alpha, beta, next_action)
+
+        if score >= beta:
+            self.cutoffs += 1
+            self.ordering.cutoff(next_action, depth, self.max_depth - depth, position.player)
+            return beta, next_action
+        alpha = score
+
+        # Only the move is kept for ordering, a depth of -1 keeps alpha_beta from using the score.
+        self.table.store(key, -1, EXACT, alpha, next_action)
 
         return alpha, next_action
 
-    @staticmethod
-    def alpha_beta(current_state, depth, max_depth, alpha, beta):
-        actions = AlphaBetaPruner.actions(current_state)
+    def serial_split(self, position, actions, depth, alpha, beta, best_action):
+        """ Searches the young brothers one after another.
+            Returns a (score, action) tuple, where a score of at least beta is a cutoff.
+        """
+        for action_ in actions:
+            position.make(action_)
+            score = self.scout(position, depth+1, alpha, beta)
+            position.unmake()
 
-        if depth > max_depth or not actions:
-            return AlphaBetaPruner.evaluation(current_state, AlphaBetaPruner.opponent(current_state[0]))
+            if score >= beta:
+                return score, action_
 
-        best_score = beta if AlphaBetaPruner.is_min(depth) else alpha
+            if score > alpha:
+                alpha = score
+                best_action = action_
 
-        for action in actions:
-            next_state = AlphaBetaPruner.next_state(current_state, action)
+        return alpha, best_action
+
+    def pool_split(self, position, actions, depth, alpha, beta, best_action):
+        """ Searches the young brothers in parallel on the process pool of the backend.
+
+            No more tasks than workers are submitted at once, and a new one is submitted
+            with the best alpha found so far whenever a result arrives. When a result causes
+            a cutoff, or the search fails, the tasks still running are aborted through the
+            abort event of the backend, and waited for, so that the pool is idle for the next split.
+
+            Returns a (score, action) tuple, where a score of at least beta is a cutoff.
+        """
+        executor, abort = self.backend.executor, self.backend.abort
+        pending = list(actions)
+        running = {}
+        cutoff = None
+
+        try:
+            while running or (pending and cutoff is None):
+                while pending and len(running) < self.backend.size and cutoff is None:
+                    action_ = pending.pop(0)
+                    position.make(action_)
+                    future = executor.submit(search_task, position.state(), position.key, depth+1, self.max_depth,
+                                             alpha, beta, self.endgame_empties, self.deadline)
+                    position.unmake()
+                    running[future] = action_
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    action_ = running.pop(future)
+                    score, nodes, cutoffs, first_cutoffs, worker = future.result()
+                    self.nodes += nodes
+                    self.cutoffs += cutoffs
+                    self.first_cutoffs += first_cutoffs
+                    if self.stats is not None:
+                        self.stats.add_task(worker, nodes)
+
+                    if score is None or cutoff is not None:
+                        continue
+
+                    if score >= beta:
+                        cutoff = score, action_
+                        abort.set()
+                    elif score > alpha:
+                        alpha = score
+                        best_action = action_
+        finally:
+            if running:
+                abort.set()
+                concurrent.futures.wait(running)
+            abort.clear()
+
+        if cutoff is not None:
+            return cutoff
+        return alpha, best_action
+
+    def mpi_split(self, position, actions, depth, alpha, beta, best_action):
+        """ Hands the young brothers out to the MPI worker ranks as they become idle.
+
+            Results are handled as they arrive, so every task that has not been sent yet
+            gets the best alpha found so far. When a result causes a cutoff, the workers
+            still searching are told to abort.
+
+            Every position has a home rank picked from its key, an idle rank first takes
+            the pending task whose home it is, so that the same subtrees keep going to the
+            same transposition table, and otherwise the next task in order.
+
+            Returns a (score, action) tuple, where a score of at least beta is a cutoff.
+        """
+        size, channel = self.backend.size, self.backend.channel
+        pending = []
+        for action_ in actions:
+            position.make(action_)
+            pending.append((action_, 1 + position.key % (size - 1)))
+            position.unmake()
+
+        running = {}
+        idle = list(range(1, size))
+        cutoff = None
+        timed_out = False
+
+        while running or (pending and cutoff is None and not timed_out):
+            while pending and idle and cutoff is None and not timed_out:
+                rank = idle.pop(0)
+                index = next((i for i, (_, home) in enumerate(pending) if home == rank), 0)
+                action_ = pending.pop(index)[0]
+                task_id = next(self.task_ids)
+
+                position.make(action_)
+                channel.send_task(rank, task_id, position.state(), position.key, depth+1, self.max_depth,
+                                  self.endgame_empties, alpha, beta, self.deadline)
+                position.unmake()
+                running[task_id] = (rank, action_)
+
+            task_id, score, nodes, cutoffs, first_cutoffs, task_timed_out = channel.recv_result()
+            rank, action_ = running.pop(task_id)
+            idle.append(rank)
+            self.nodes += nodes
+            self.cutoffs += cutoffs
+            self.first_cutoffs += first_cutoffs
+            if self.stats is not None:
+                self.stats.add_task(rank, nodes)
+
+            if task_timed_out and not timed_out:
+                timed_out = True
+                self.abort(running)
+
+            if score is None or cutoff is not None or timed_out:
+                continue
+
+            if score >= beta:
+                cutoff = score, action_
+                self.abort(running)
+            elif score > alpha:
+                alpha = score
+                best_action = action_
+
+        if timed_out:
+            raise SearchTimeout
+        if cutoff is not None:
+            return cutoff
+        return alpha, best_action
+
+    def abort(self, running):
+        """ Tells the ranks searching the running tasks to stop, each of them still sends one result.
+        """
+        for task_id, (rank, _) in running.items():
+            self.backend.channel.send_abort(rank, task_id)
 
-            if AlphaBetaPruner.is_min(depth):
-                score = AlphaBetaPruner.alpha_beta(next_state, depth + 1, max_depth, alpha, best_score)
-                if score <= alpha:
+    def check_interrupt(self):
+        """ Raises SearchTimeout when the deadline has passed, and SearchAborted
+            when the stop event is set or an MPI worker has been told to abort its current task.
+        """
+        if self.deadline is not None and time.time() >= self.deadline:
+            raise SearchTimeout
+
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchAborted
+
+        if self.task is not None:
+            # Aborts of tasks that have already finished are dropped.
+            task_id = self.backend.channel.poll_abort()
+            while task_id is not None:
+                if task_id == self.task:
+                    raise SearchAborted
+                task_id = self.backend.channel.poll_abort()
+
+    def solve_endgame(self, position):
+        """ Returns the tile of the move with the best final disc difference, searched to the end of the game.
+        """
+        self.endgame.nodes = 0
+        tile = self.endgame.best_move(position.own, position.opp)[1]
+        self.nodes += self.endgame.nodes
+        return tile
+
+    def solve_win_loss_draw(self, position):
+        """ Returns the tile of a move winning, or else drawing, the game with perfect play, searched
+            to the end of the game with the win/loss/draw search. Returns None when every move loses,
+            the move is then left to the search.
+        """
+        self.endgame.nodes = 0
+        tile = self.endgame.winning_move(position.own, position.opp)[1]
+        self.nodes += self.endgame.nodes
+        return tile
+
+    def endgame_score(self, position, key, alpha, beta):
+        """ Returns the exact result of the position for the player to move, DISC_SCORE per disc,
+            an upper bound when it is at most alpha and a lower bound when it is at least beta.
+        """
+        entry = self.table.probe(key)
+        if entry is not None and entry[1] >= WIDTH * HEIGHT:
+            _, _, flag, score, _ = entry
+            if flag == EXACT or (flag == LOWER and score >= beta) or (flag == UPPER and score <= alpha):
+                return score
+
+        # The solver scores in discs.
+        low = math.floor(max(alpha / DISC_SCORE, -WIDTH * HEIGHT - 1))
+        high = math.ceil(min(beta / DISC_SCORE, WIDTH * HEIGHT + 1))
+
+        self.endgame.nodes = 0
+        score = DISC_SCORE * self.endgame.solve(position.own, position.opp, low, high)
+        self.nodes += self.endgame.nodes
+
+        flag = UPPER if score <= alpha else LOWER if score >= beta else EXACT
+        self.table.store(key, WIDTH * HEIGHT, flag, score, None)
+        return score
+
+    def scout(self, position, depth, alpha, beta):
+        """ Returns the score of the move just made for the player who made it. The move is searched
+            with a null window above alpha, and again with the full window only when it fails high.
+        """
+        score = -self.alpha_beta(position, depth, -alpha - NULL_WINDOW, -alpha)
+        if alpha < score < beta:
+            score = -self.alpha_beta(position, depth, -beta, -alpha)
+        return score
+
+    def alpha_beta(self, position, depth, alpha, beta):
+        """ Returns the score of the position for the player to move, alpha when it is
+            at most alpha and beta when it is at least beta.
+        """
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self.check_interrupt()
+
+        key = position.key
+        if position.empties <= self.endgame_empties:
+            return self.endgame_score(position, key, alpha, beta)
+
+        actions = position.actions()
+
+        if depth > self.max_depth or not actions:
+            return self.evaluate(position)
+
+        remaining = self.max_depth - depth
+        entry = self.table.probe(key)
+        move = None
+        if entry is not None:
+            _, entry_depth, flag, score, move = entry
+            if entry_depth >= remaining:
+                if flag == EXACT:
+                    return min(max(score, alpha), beta)
+                if flag == LOWER and score >= beta:
+                    return beta
+                if flag == UPPER and score <= alpha:
                     return alpha
-                if score < best_score:
-                    best_score = score
+        self.ordering.order(actions, depth, position.player, move)
+
+        flag = UPPER
+        best_move = actions[0]
+
+        for action in actions:
+            position.make(action)
+            if action == actions[0]:
+                score = -self.alpha_beta(position, depth + 1, -beta, -alpha)
             else:
-                score = AlphaBetaPruner.alpha_beta(next_state, depth + 1, max_depth, best_score, beta)
-                if score >= beta:
-                    return beta
-                if score > best_score:
-                    best_score = score
+                score = self.scout(position, depth + 1, alpha, beta)
+            position.unmake()
 
-        return best_score
+            if score >= beta:
+                self.table.store(key, remaining, LOWER, beta, action)
+                self.ordering.cutoff(action, depth, remaining, position.player)
+                self.cutoffs += 1
+                if action == actions[0]:
+                    self.first_cutoffs += 1
+                return beta
+            if score > alpha:
+                alpha = score
+                flag = EXACT
+                best_move = action
 
-    @staticmethod
-    def is_min(depth):
-        return depth % 2 == 1
+        self.table.store(key, remaining, flag, alpha, best_move)
+
+        return alpha
 
     @staticmethod
     def evaluation(current_state, player_to_check):
         """ Returns a positive value when the player wins.
             Returns zero when there is a draw.
-            Returns a negative value when the opponent wins."""
-
-        player_state, state = current_state
-        player = player_to_check
-        opponent = AlphaBetaPruner.opponent(player)
-
-        # count_eval stands for the player with the most pieces next turn
-        moves = AlphaBetaPruner.get_moves(player, opponent, state)
-        player_pieces = len([p for p in state if p == player])
-        opponent_pieces = len([p for p in state if p == opponent])
-        count_eval = 1 if player_pieces > opponent_pieces else \
-            0 if player_pieces == opponent_pieces else \
-            -1
-
-        # moves_player    = moves
-        # moves_oppponent = AlphaBetaPruner.get_moves(opponent, player, state)
-        # move_eval       = 1 if moves_player > moves_oppponent else \
-        #                   0 if moves_player == moves_oppponent else \
-        #                  -1
-
-        corners_player = (state[0] == player) + \
-                         (state[(WIDTH - 1)] == player) + \
-                         (state[(WIDTH - 1) * WIDTH] == player) + \
-                         (state[WIDTH**2 - 1] == player)
-        corners_opponent = -1 * (state[0] == opponent) + \
-                           (state[(WIDTH - 1)] == opponent) + \
-                           (state[(WIDTH - 1) * WIDTH] == opponent) + \
-                           (state[WIDTH**2 - 1] == opponent)
-        corners_eval = corners_player + corners_opponent
-
-        edges_player = len([x for x in state if state == player and (state % WIDTH == 0 or state % WIDTH == WIDTH)]) / (
-            WIDTH * HEIGHT)
-        edges_opponent = -1 * len([x for x in state if state == opponent and (state % WIDTH == 0 or state % WIDTH == WIDTH)]) / (
-            WIDTH * HEIGHT)
-        edges_eval = edges_player + edges_opponent
-
-        eval = count_eval * 2 + corners_eval * 1.5 + edges_eval * 1.2
-
-        return eval
+            Returns a negative value when the opponent wins.
+
+            The search evaluates with Position.evaluation, which keeps the terms up to date
+            while moves are made, this evaluates a single state from scratch."""
+        return Position(current_state).evaluation(player_to_check)
 
     @staticmethod
     def actions(current_state):
         """ 
-        Returns a list of tuples as coordinates for the valid moves for the current player.
+        Returns a list of tiles for the valid moves for the current player.
         """
-        player, state = current_state
-        return AlphaBetaPruner.get_moves(player, AlphaBetaPruner.opponent(player), state)
+        player, own, opp = current_state
+        return bitboard.tiles(bitboard.get_moves(own, opp))
 
     @staticmethod
     def opponent(player):
@@ -200,62 +498,11 @@ class AlphaBetaPruner(object):
     @staticmethod
     def next_state(current_state, action):
         """ 
-        Returns the next state in the form of a "current_state" tuple, (current_player, state).
+        Returns the next state in the form of a "current_state" tuple, (current_player, own, opp).
         """
-        player, state = current_state
-        # player, state = current_state[0], current_state[1].copy()
-        opponent = AlphaBetaPruner.opponent(player)
-
-        xx, yy = action
-        state[xx + (yy * WIDTH)] = player
-        for d in DIRECTIONS:
-            tile = xx + (yy * WIDTH) + d
-            if tile < 0 or tile >= (WIDTH - 1) * WIDTH:
-                continue
-
-            while state[tile] != BOARD_ID:
-                state[tile] = player
-                tile += d
-                if tile < 0 or tile >= WIDTH * HEIGHT:
-                    tile -= d
-                    break
-
-        return opponent, state
-
-    @staticmethod
-    def get_moves(player, opponent, state):
-        """ 
-        Returns a generator of (x,y) coordinates.
-        """
-        moves = [AlphaBetaPruner.mark_move(player, opponent, tile, state, d)
-                 for tile in range(WIDTH * HEIGHT)
-                 for d in DIRECTIONS
-                 if not outside_board(tile, d) and state[tile] == player]
-
-        return [(x, y) for found, x, y, tile in moves if found]
-
-    @staticmethod
-    def mark_move(player, opponent, tile, pieces, direction):
-        """ 
-        Returns True whether the current tile piece is a move for the current player,
-        otherwise it returns False.
-        """
-        if not outside_board(tile, direction):
-            tile += direction
-        else:
-            return False, int(tile % WIDTH), int(tile / HEIGHT), tile
-
-        if pieces[tile] == opponent:
-            while pieces[tile] == opponent:
-                if outside_board(tile, direction):
-                    break
-                else:
-                    tile += direction
-
-            if pieces[tile] == BOARD_ID:
-                return True, int(tile % WIDTH), int(tile / HEIGHT), tile
-
-        return False, int(tile % WIDTH), int(tile / HEIGHT), tile
+        player, own, opp = current_state
+        flips = bitboard.get_flips(own, opp, action)
+        return AlphaBetaPruner.opponent(player), opp ^ flips, own | flips | (1 << action)
 
     def is_leaf(self, depth):
         """ 
@@ -264,3 +511,63 @@ class AlphaBetaPruner(object):
         return depth > self.max_depth
 
 
+# The pruner of a process pool worker, it keeps its transposition table for the whole game.
+_process_pruner = None
+
+
+def init_process(table_size=DEFAULT_TABLE_SIZE, evaluator=None, abort=None):
+    """ Initializer of the process pool workers, the tasks stop when the 'abort' event is set.
+    """
+    global _process_pruner
+    _process_pruner = AlphaBetaPruner(None, 0, None, None, TranspositionTable(table_size), evaluator=evaluator)
+    _process_pruner.stop_event = abort
+
+
+def search_task(current_state, key, depth, max_depth, alpha, beta, endgame_empties, deadline):
+    """ Runs a scout of a young brother in a process pool worker and returns a
+        (score, nodes, cutoffs, first_cutoffs, pid) tuple, the score is for the player who made the move
+        and None when the task was aborted.
+    """
+    pruner = _process_pruner
+    pruner.endgame_empties = endgame_empties
+    pruner.max_depth = max_depth
+    pruner.deadline = deadline
+    pruner.nodes = pruner.cutoffs = pruner.first_cutoffs = 0
+    try:
+        score = pruner.scout(pruner.make_position(current_state, key), depth, alpha, beta)
+    except SearchAborted:
+        score = None
+    return score, pruner.nodes, pruner.cutoffs, pruner.first_cutoffs, os.getpid()
+
+
+def mpi_worker(backend, table_size=DEFAULT_TABLE_SIZE, evaluator=None):
+    """ Runs the loop of an MPI worker rank: it receives young brothers from rank 0 through the channel
+        of the MPI backend, searches them and sends back a result for every task, with no score when
+        the task was aborted. Returns when it receives STOP_MESSAGE.
+
+        The transposition table of the rank lives for the whole game.
+    """
+    pruner = AlphaBetaPruner(mutex=None, max_depth=0, pieces=None, first_player=None,
+                             table=TranspositionTable(table_size), backend=backend, evaluator=evaluator)
+    channel = backend.channel
+
+    while True:
+        task_id, current_state, key, depth, max_depth, endgame_empties, alpha, beta, deadline = channel.recv_task()
+        if task_id == STOP_MESSAGE:
+            break
+
+        pruner.endgame_empties = endgame_empties
+        pruner.max_depth = max_depth
+        pruner.deadline = deadline
+        pruner.task = task_id
+        pruner.nodes = pruner.cutoffs = pruner.first_cutoffs = 0
+        score, timed_out = None, False
+        try:
+            score = pruner.scout(position=pruner.make_position(current_state, key), depth=depth, alpha=alpha,
+                                 beta=beta)
+        except SearchAborted:
+            pass
+        except SearchTimeout:
+            timed_out = True
+
+        channel.send_result(task_id, score, pruner.nodes, pruner.cutoffs, pruner.first_cutoffs, timed_out)
@@ -0,0 +1,195 @@
+"""
+Backends running the search of the young brothers: serially, on a process pool or on MPI ranks.
+
+The backend is picked when the program starts, and mpi4py is only imported
+when the MPI backend is picked, so a run without MPI never loads it.
+"""
+import math
+import os
+import struct
+from game.settings import *
+
+# Message tags of the MPI master/worker protocol.
+TASK_TAG = 1
+RESULT_TAG = 2
+ABORT_TAG = 3
+
+# Fixed layouts of the MPI messages:
+#   task:   id, player, own, opp, key, depth, max depth, endgame empties, alpha, beta, deadline (0 for none)
+#   result: id, score (NaN when aborted), nodes, cutoffs, first move cutoffs, timed out
+#   abort:  id
+# The depths are unsigned 32 bit integers, a depth given on the command line can be far above 255.
+TASK_FORMAT = struct.Struct('<qBQQQIIIddd')
+RESULT_FORMAT = struct.Struct('<qdQQQ?')
+ABORT_FORMAT = struct.Struct('<q')
+
+
+class Channel(object):
+    """Sends and receives the MPI messages as raw bytes through buffers that are allocated once."""
+
+    def __init__(self, comm, mpi):
+        self.comm = comm
+        self.byte = mpi.BYTE
+        self.any_source = mpi.ANY_SOURCE
+        self.task = bytearray(TASK_FORMAT.size)
+        self.result = bytearray(RESULT_FORMAT.size)
+        self.abort = bytearray(ABORT_FORMAT.size)
+
+    def send_task(self, rank, task_id, current_state, key, depth, max_depth, endgame_empties, alpha, beta,
+                  deadline):
+        player, own, opp = current_state
+        TASK_FORMAT.pack_into(self.task, 0, task_id, player, own, opp, key, depth, max_depth, endgame_empties,
+                              alpha, beta, deadline or 0.0)
+        self.comm.Send([self.task, self.byte], dest=rank, tag=TASK_TAG)
+
+    def send_stop(self, rank):
+        TASK_FORMAT.pack_into(self.task, 0, STOP_MESSAGE, 0, 0, 0, 0, 0, 0, 0, 0.0, 0.0, 0.0)
+        self.comm.Send([self.task, self.byte], dest=rank, tag=TASK_TAG)
+
+    def recv_task(self):
+        """ Returns a (id, current_state, key, depth, max_depth, endgame_empties, alpha, beta, deadline) tuple.
+        """
+        self.comm.Recv([self.task, self.byte], source=0, tag=TASK_TAG)
+        task_id, player, own, opp, key, depth, max_depth, endgame_empties, alpha, beta, deadline = \
+            TASK_FORMAT.unpack_from(self.task)
+        return task_id, (player, own, opp), key, depth, max_depth, endgame_empties, alpha, beta, deadline or None
+
+    def send_result(self, task_id, score, nodes, cutoffs, first_cutoffs, timed_out):
+        RESULT_FORMAT.pack_into(self.result, 0, task_id, math.nan if score is None else score, nodes,
+                                cutoffs, first_cutoffs, timed_out)
+        self.comm.Send([self.result, self.byte], dest=0, tag=RESULT_TAG)
+
+    def recv_result(self):
+        """ Returns a (id, score, nodes, cutoffs, first_cutoffs, timed_out) tuple from any worker,
+            the score is None when aborted.
+        """
+        self.comm.Recv([self.result, self.byte], source=self.any_source, tag=RESULT_TAG)
+        task_id, score, nodes, cutoffs, first_cutoffs, timed_out = RESULT_FORMAT.unpack_from(self.result)
+        return task_id, None if math.isnan(score) else score, nodes, cutoffs, first_cutoffs, timed_out
+
+    def send_abort(self, rank, task_id):
+        ABORT_FORMAT.pack_into(self.abort, 0, task_id)
+        self.comm.Send([self.abort, self.byte], dest=rank, tag=ABORT_TAG)
+
+    def poll_abort(self):
+        """ Returns the id of a received abort message, or None when there is none.
+        """
+        if not self.comm.Iprobe(source=0, tag=ABORT_TAG):
+            return None
+        self.comm.Recv([self.abort, self.byte], source=0, tag=ABORT_TAG)
+        return ABORT_FORMAT.unpack_from(self.abort)[0]
+
+
+class SerialBackend(object):
+    """Searches everything in the current process."""
+
+    name = 'serial'
+    rank = 0
+    size = 1
+    channel = None
+
+    def splitter(self, pruner):
+        """ Returns the method of the pruner searching the young brothers.
+        """
+        return pruner.serial_split
+
+    def is_worker(self):
+        """ Returns True in the processes that only search the subtrees they are sent.
+        """
+        return False
+
+    def run_worker(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class PoolBackend(SerialBackend):
+    """Searches the young brothers on a process pool, every process keeps its own transposition table."""
+
+    name = 'pool'
+
+    def __init__(self, workers, table_size, evaluator=None):
+        import concurrent.futures
+        import multiprocessing
+        from game.ai import init_process
+        self.size = workers
+        # Set by the master to stop the running tasks once their results are no longer needed.
+        self.abort = multiprocessing.Event()
+        self.executor = concurrent.futures.ProcessPoolExecutor(workers, initializer=init_process,
+                                                               initargs=(table_size, evaluator, self.abort))
+
+    def splitter(self, pruner):
+        return pruner.pool_split
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+class MPIBackend(SerialBackend):
+    """Searches the young brothers on the worker ranks of MPI.COMM_WORLD, rank 0 runs the game."""
+
+    name = 'mpi'
+
+    def __init__(self, table_size, evaluator=None):
+        from mpi4py import MPI
+        self.comm = MPI.COMM_WORLD
+        self.rank = self.comm.Get_rank()
+        self.size = self.comm.Get_size()
+        self.table_size = table_size
+        self.evaluator = evaluator
+        self.channel = Channel(self.comm, MPI)
+
+    def splitter(self, pruner):
+        return pruner.mpi_split if self.size > 1 else pruner.serial_split
+
+    def is_worker(self):
+        return self.rank != 0
+
+    def run_worker(self):
+        """ Searches the tasks sent by rank 0 until it sends the stop message.
+        """
+        from game.ai import mpi_worker
+        mpi_worker(self, self.table_size, self.evaluator)
+
+    def shutdown(self):
+        """ Stops the worker ranks, called by rank 0 once the game is over.
+        """
+        if self.rank == 0:
+            for rank in range(1, self.size):
+                self.channel.send_stop(rank)
+
+
+SERIAL = SerialBackend()
+
+BACKENDS = ('auto', 'serial', 'pool', 'mpi')
+
+# Environment variables set by the MPI launchers (Open MPI, MPICH and Intel MPI, PMIx) in every rank.
+MPI_ENVIRONMENT = ('OMPI_COMM_WORLD_SIZE', 'PMI_SIZE', 'PMIX_RANK', 'MPI_LOCALNRANKS')
+
+
+def launched_by_mpi():
+    """ Returns True when the process was started by an MPI launcher such as mpirun.
+    """
+    return any(variable in os.environ for variable in MPI_ENVIRONMENT)
+
+
+def select_backend(name='auto', workers=1, table_size=None, evaluator=None):
+    """ Returns the backend called 'name'. 'auto' picks MPI when the process was started by an
+        MPI launcher, a process pool when there is more than one worker, and otherwise the serial backend.
+        The workers evaluate with 'evaluator'.
+    """
+    from game.table import DEFAULT_TABLE_SIZE
+    table_size = table_size or DEFAULT_TABLE_SIZE
+
+    if name == 'auto':
+        name = 'mpi' if launched_by_mpi() else 'pool' if workers > 1 else 'serial'
+
+    if name == 'mpi':
+        return MPIBackend(table_size, evaluator)
+    if name == 'pool':
+        return PoolBackend(max(workers, 1), table_size, evaluator)
+    if name == 'serial':
+        return SERIAL
+    raise ValueError('Unknown backend {0}'.format(name))
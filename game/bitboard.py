@@ -0,0 +1,130 @@
+"""
+Bitboard representation of a Reversi position.
+
+A position is stored as two 64 bit integers, one for the discs of the player
+to move ("own") and one for the discs of its opponent ("opp"). Bit n is set
+when the tile n = x + (y * WIDTH) is occupied.
+"""
+from game.settings import *
+
+FULL = (1 << (WIDTH * HEIGHT)) - 1
+A_FILE = sum(1 << (y * WIDTH) for y in range(HEIGHT))
+H_FILE = A_FILE << (WIDTH - 1)
+NOT_A_FILE = FULL ^ A_FILE
+NOT_H_FILE = FULL ^ H_FILE
+FIRST_RANK = (1 << WIDTH) - 1
+LAST_RANK = FIRST_RANK << ((HEIGHT - 1) * WIDTH)
+EDGES = A_FILE | H_FILE | FIRST_RANK | LAST_RANK
+CORNERS = (1 << 0) | (1 << (WIDTH - 1)) | (1 << ((HEIGHT - 1) * WIDTH)) | (1 << (WIDTH * HEIGHT - 1))
+
+# For every tile, the rays of RAYS as single bit values. Rays shorter than two
+# tiles can never enclose a disc and are left out.
+BIT_RAYS = tuple(tuple(tuple(1 << t for t in ray) for ray in rays.values() if len(ray) > 1) for rays in RAYS)
+
+
+def from_list(state, player, opponent):
+    """ Returns an (own, opp) tuple of bitboards from a list of piece ids.
+    """
+    own = opp = 0
+    for tile, piece in enumerate(state):
+        if piece == player:
+            own |= 1 << tile
+        elif piece == opponent:
+            opp |= 1 << tile
+    return own, opp
+
+
+def get_moves(own, opp):
+    """ Returns a bitboard of all the legal moves for the player owning 'own'.
+    """
+    empty = FULL ^ (own | opp)
+    moves = 0
+
+    # Only the inner six files can be jumped over horizontally or diagonally.
+    inner = opp & NOT_A_FILE & NOT_H_FILE
+
+    for amount, mask in ((1, inner), (WIDTH, opp), (WIDTH - 1, inner), (WIDTH + 1, inner)):
+        x = (own << amount) & mask
+        x |= (x << amount) & mask
+        x |= (x << amount) & mask
+        x |= (x << amount) & mask
+        x |= (x << amount) & mask
+        x |= (x << amount) & mask
+        moves |= (x << amount) & empty
+
+        x = (own >> amount) & mask
+        x |= (x >> amount) & mask
+        x |= (x >> amount) & mask
+        x |= (x >> amount) & mask
+        x |= (x >> amount) & mask
+        x |= (x >> amount) & mask
+        moves |= (x >> amount) & empty
+
+    return moves
+
+
+def get_flips(own, opp, tile):
+    """ Returns a bitboard of the opponent discs flipped by playing on 'tile'.
+    """
+    flips = 0
+    for ray in BIT_RAYS[tile]:
+        line = 0
+        for bit in ray:
+            if bit & opp:
+                line |= bit
+            else:
+                if bit & own:
+                    flips |= line
+                break
+    return flips
+
+
+def count(bits):
+    """ Returns the number of set bits.
+    """
+    return bin(bits).count('1')
+
+
+def tiles(bits):
+    """ Returns a list of the tiles set in the bitboard, in board-scan order.
+    """
+    result = []
+    while bits:
+        low = bits & -bits
+        result.append(low.bit_length() - 1)
+        bits ^= low
+    return result
+
+
+def to_coordinates(tile):
+    """ Returns the (x, y) coordinates of a tile.
+    """
+    return tile % WIDTH, tile // WIDTH
+
+
+def to_tile(coordinates):
+    """ Returns the tile of an (x, y) tuple.
+    """
+    x, y = coordinates
+    return x + (y * WIDTH)
+
+
+def _symmetries():
+    """ Returns the 8 symmetries of the board as tile permutations, symmetry[tile] is the moved tile.
+    """
+    last = WIDTH - 1
+    transforms = (
+        lambda x, y: (x, y),
+        lambda x, y: (last - x, y),
+        lambda x, y: (x, last - y),
+        lambda x, y: (last - x, last - y),
+        lambda x, y: (y, x),
+        lambda x, y: (last - y, x),
+        lambda x, y: (y, last - x),
+        lambda x, y: (last - y, last - x),
+    )
+    return tuple(tuple(to_tile(t(*to_coordinates(tile))) for tile in range(WIDTH * HEIGHT))
+                 for t in transforms)
+
+
+SYMMETRIES = _symmetries()
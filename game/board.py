@@ -1,68 +1,133 @@
-from game.piece import Piece
+from game import bitboard
+from game.piece import Piece, GLYPHS
 from game.settings import *
 
 
 class Board(object):
-    """Board represents the current state of the Reversi board."""
+    """Board represents the current state of the Reversi board.
+
+    The tiles are kept as bitboards (see game/bitboard.py): the white discs, the
+    black discs, the tiles marked as moves and the flipped discs. The pieces are
+    views of the tiles, made the first time they are asked for. The legal moves
+    of each colour are kept until the discs change.
+    """
 
     def __init__(self, colour):
         self.width = WIDTH
         self.height = HEIGHT
-        self.pieces = list((Piece(x, y, colour)
-                            for y in range(0, self.height)
-                            for x in range(0, self.width)))
+        self.colour = colour
+        self.white = 0
+        self.black = 0
+        self.marked = 0
+        self.flipped = 0
+        self.moves = {}
+        self._pieces = None
+
+    @property
+    def pieces(self):
+        """ Returns the list of pieces, row by row.
+        """
+        if self._pieces is None:
+            self._pieces = [Piece(x, y, board=self) for y in range(0, self.height) for x in range(0, self.width)]
+        return self._pieces
 
     def draw(self):
         """ Returns a representation of the board in monochrome or 256 RGB colour.
         """
         labels = "  a.b.c.d.e.f.g.h."
+        glyphs = GLYPHS[self.colour]
 
         grid = ''
-        i = 0
-        for row_of_pieces in chunks(self.pieces, WIDTH):
-            row = ''
-            for p in row_of_pieces:
-                row += p.draw()
-
-            grid += '{0} {1}{0}\n'.format(str(i + 1), row)
-
-            i += 1
+        for y in range(0, self.height):
+            row = ''.join(glyphs[self.get_state(x, y), bool(self.flipped >> (x + y * WIDTH) & 1)]
+                          for x in range(0, self.width))
+            grid += '{0} {1}{0}\n'.format(str(y + 1), row)
 
         output = '{0}\n{1}{0}'.format(labels, grid)
         return output
 
+    def get_state(self, x, y):
+        """ Returns the state of the specified tile.
+        """
+        bit = 1 << (x + y * WIDTH)
+        if self.white & bit:
+            return WHITE
+        if self.black & bit:
+            return BLACK
+        if self.marked & bit:
+            return MOVE
+        return BOARD
+
     def set_white(self, x, y):
         """ Sets the specified piece's state to WHITE.
         """
-        self.pieces[x + (y * self.width)].set_white()
+        bit = 1 << (x + y * WIDTH)
+        self.white |= bit
+        self.black &= ~bit
+        self.marked &= ~bit
+        self.moves.clear()
 
     def set_black(self, x, y):
         """ Sets the specified piece's state to BLACK.
         """
-        self.pieces[x + (y * self.width)].set_black()
+        bit = 1 << (x + y * WIDTH)
+        self.black |= bit
+        self.white &= ~bit
+        self.marked &= ~bit
+        self.moves.clear()
 
     def set_move(self, x, y):
         """ Sets the specified piece's state to MOVE.
         """
-        self.pieces[x + (y * self.width)].set_move()
+        bit = 1 << (x + y * WIDTH)
+        if (self.white | self.black) & bit:
+            self.white &= ~bit
+            self.black &= ~bit
+            self.moves.clear()
+        self.marked |= bit
+
+    def set_board(self, x, y):
+        """ Sets the specified piece's state to BOARD.
+        """
+        bit = 1 << (x + y * WIDTH)
+        if (self.white | self.black) & bit:
+            self.white &= ~bit
+            self.black &= ~bit
+            self.moves.clear()
+        self.marked &= ~bit
 
     def flip(self, x, y):
-        """ Flips the specified piece's state from WHITE<->BLACK.
+        """ Flips the specified piece's state from WHITE<->BLACK and marks it as flipped.
+            Raises a ValueError for a move/board piece.
         """
-        self.pieces[x + (y * self.width)].flip()
+        bit = 1 << (x + y * WIDTH)
+        if not (self.white | self.black) & bit:
+            raise ValueError
+        self.white ^= bit
+        self.black ^= bit
+        self.flipped |= bit
+        self.moves.clear()
 
     def set_flipped(self, x, y):
         """ Sets the specified piece as flipped.
         """
-        self.pieces[x + (y * self.width)].set_flipped()
+        self.flipped |= 1 << (x + y * WIDTH)
+
+    def legal_moves(self, player):
+        """ Returns the bitboard of the valid moves for the specified player.
+        """
+        moves = self.moves.get(player)
+        if moves is None:
+            own, opp = (self.white, self.black) if player == WHITE else (self.black, self.white)
+            moves = self.moves[player] = bitboard.get_moves(own, opp)
+        return moves
 
     def get_move_pieces(self, player):
         """ Returns a list of moves for the specified player.
         """
-        self.mark_moves(player)
-        moves = [piece for piece in self.pieces if piece.get_state() == MOVE]
         self.clear_moves()
-        return moves
+        pieces = self.pieces
+        return [pieces[tile] for tile in bitboard.tiles(self.legal_moves(player))]
 
     def mark_moves(self, player):
         """ Marks all 'BOARD' pieces that are valid moves as 'MOVE' pieces
@@ -70,30 +135,7 @@ class Board(object):
 
             Returns: void
         """
-        [self.mark_move(player, p, d)
-         for p in self.pieces
-         for d in DIRECTIONS
-         if p.get_state() == player]
-
-    def mark_move(self, player, piece, direction):
-        """ Will mark moves from the current 'piece' in 'direction'.
-        """
-        x, y = piece.get_position()
-        opponent = get_opponent(player)
-        if self.outside_board(x + (y * WIDTH), direction):
-            return
-
-        tile = (x + (y * WIDTH)) + direction
-
-        if self.pieces[tile].get_state() == opponent:
-            while self.pieces[tile].get_state() == opponent:
-                if self.outside_board(tile, direction):
-                    break
-                else:
-                    tile += direction
-
-            if self.pieces[tile].get_state() == BOARD:
-                self.pieces[tile].set_move()
+        self.marked |= self.legal_moves(player)
 
     def make_move(self, coordinates, player):
         """ Will modify the internal state to represent performing the
@@ -101,59 +143,33 @@ class Board(object):
         """
         x, y = coordinates
 
-        moves = [piece.get_position() for piece in self.get_move_pieces(player)]
-
-        if coordinates not in moves:
+        if (x < 0 or x >= WIDTH) or (y < 0 or y >= HEIGHT):
             raise ValueError
 
-        if (x < 0 or x >= WIDTH) or (y < 0 or y >= HEIGHT):
+        tile = x + (y * WIDTH)
+        if not self.legal_moves(player) >> tile & 1:
             raise ValueError
 
-        opponent = get_opponent(player)
-        p = self.pieces[x + (y * WIDTH)]
+        own, opp = (self.white, self.black) if player == WHITE else (self.black, self.white)
+        flips = bitboard.get_flips(own, opp, tile)
+        own |= flips | (1 << tile)
+        opp ^= flips
         if player == WHITE:
-            p.set_white()
+            self.white, self.black = own, opp
         else:
-            p.set_black()
-        for d in DIRECTIONS:
-            start = x + (y * WIDTH) + d
-            tile = start
-
-            to_flip = []
-            if (tile >= 0) and (tile < WIDTH*HEIGHT):
-                while self.pieces[tile].get_state() != BOARD:
-                    to_flip.append(self.pieces[tile])
-                    if self.outside_board(tile, d):
-                        break
-                    else:
-                        tile += d
-
-                start_flipping = False
-                for pp in reversed(to_flip):
-                    if not start_flipping:
-                        if pp.get_state() == opponent:
-                            continue
-                    start_flipping = True
-
-                    if player == WHITE:
-                        pp.set_white()
-                    else:
-                        pp.set_black()
-
-                self.pieces[start].reset_flipped()
+            self.black, self.white = own, opp
+        self.marked &= ~(1 << tile)
+        self.moves.clear()
 
     def clear_moves(self):
         """ Sets all move pieces to board pieces.
         """
-        [x.set_board() for x in self.pieces if x.get_state() == MOVE]
+        self.marked = 0
 
     def outside_board(self, tile, direction):
         """ Returns true if a tile is outside the board.
         """
-        return (direction in (NORTHWEST, NORTH, NORTHEAST) and 0 <= tile <= WIDTH - 1) or \
-           (direction in (SOUTHWEST, SOUTH, SOUTHEAST) and (WIDTH-1) * WIDTH <= tile <= WIDTH**2 - 1) or \
-           (direction in (NORTHEAST, EAST, SOUTHEAST) and tile % WIDTH == WIDTH - 1) or \
-           (direction in (NORTHWEST, WEST, SOUTHWEST) and tile % WIDTH == 0)
+        return outside_board(tile, direction)
 
     def __repr__(self):
         return self.draw()
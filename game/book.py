@@ -0,0 +1,240 @@
+"""
+Opening book, a sorted file of positions and their best moves.
+
+The file starts with a header (magic and number of records) followed by
+fixed size records (own, opp, move, score) sorted by (own, opp). Positions are
+stored in their canonical form, the smallest (own, opp) among the 8 symmetries
+of the board, so one record covers all the mirrored and rotated positions.
+
+The file is memory-mapped read-only, every process using the same book on a
+host shares its pages.
+"""
+import argparse
+import mmap
+import os
+import struct
+from game import bitboard
+from game.position import Position
+from game.settings import *
+
+HEADER_FORMAT = struct.Struct('<8sQ')
+RECORD_FORMAT = struct.Struct('<QQBxxxf')
+MAGIC = b'RVBOOK1\0'
+
+INVERSES = tuple(tuple(s.index(tile) for tile in range(WIDTH * HEIGHT)) for s in bitboard.SYMMETRIES)
+
+# BYTE_TABLES[s][i][byte] is the bitboard of 'byte' at byte position i moved by symmetry s.
+BYTE_TABLES = tuple(
+    tuple(tuple(sum(1 << s[8 * i + bit] for bit in range(8) if byte >> bit & 1) for byte in range(256))
+          for i in range(8))
+    for s in bitboard.SYMMETRIES)
+
+
+def transform(bits, symmetry):
+    """ Returns the bitboard moved by the symmetry.
+    """
+    tables = BYTE_TABLES[symmetry]
+    return tables[0][bits & 0xff] | tables[1][bits >> 8 & 0xff] | tables[2][bits >> 16 & 0xff] | \
+        tables[3][bits >> 24 & 0xff] | tables[4][bits >> 32 & 0xff] | tables[5][bits >> 40 & 0xff] | \
+        tables[6][bits >> 48 & 0xff] | tables[7][bits >> 56]
+
+
+def canonical(own, opp):
+    """ Returns an (own, opp, symmetry) tuple with the smallest (own, opp) among the symmetries.
+    """
+    return min((transform(own, s), transform(opp, s), s) for s in range(len(bitboard.SYMMETRIES)))
+
+
+class Book(object):
+    """Read-only opening book backed by a memory-mapped file."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size = HEADER_FORMAT.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError('{0} is not an opening book'.format(path))
+
+    def find(self, own, opp):
+        """ Returns the (move, score) record of a canonical position, or None.
+        """
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            record_own, record_opp, move, score = RECORD_FORMAT.unpack_from(
+                self.data, HEADER_FORMAT.size + middle * RECORD_FORMAT.size)
+            if (record_own, record_opp) == (own, opp):
+                return move, score
+            if (record_own, record_opp) < (own, opp):
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def lookup(self, current_state):
+        """ Returns the book move of a (current_player, own, opp) state as an (x, y) tuple, or None.
+        """
+        _, own, opp = current_state
+        canonical_own, canonical_opp, symmetry = canonical(own, opp)
+        record = self.find(canonical_own, canonical_opp)
+        if record is None:
+            return None
+
+        tile = INVERSES[symmetry][record[0]]
+        if not bitboard.get_moves(own, opp) >> tile & 1:
+            return None
+        return bitboard.to_coordinates(tile)
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.size
+
+
+def read_records(path):
+    """ Returns the records of a book file as a dict of (own, opp): (move, score).
+    """
+    if not os.path.exists(path):
+        return {}
+    book = Book(path)
+    records = {}
+    for i in range(book.size):
+        own, opp, move, score = RECORD_FORMAT.unpack_from(book.data, HEADER_FORMAT.size + i * RECORD_FORMAT.size)
+        records[own, opp] = move, score
+    book.close()
+    return records
+
+
+def write_records(path, records):
+    """ Writes a dict of (own, opp): (move, score) records, which must be canonical, to a book file.
+    """
+    with open(path, 'wb') as f:
+        f.write(HEADER_FORMAT.pack(MAGIC, len(records)))
+        for (own, opp), (move, score) in sorted(records.items()):
+            f.write(RECORD_FORMAT.pack(own, opp, move, score))
+
+
+def add_record(records, current_state, tile, score):
+    """ Adds the move 'tile' of a state to the records in canonical form.
+    """
+    _, own, opp = current_state
+    canonical_own, canonical_opp, symmetry = canonical(own, opp)
+    records[canonical_own, canonical_opp] = bitboard.SYMMETRIES[symmetry][tile], score
+
+
+def start_state():
+    """ Returns the state at the start of a game, black moves first.
+    """
+    black = (1 << bitboard.to_tile((4, 3))) | (1 << bitboard.to_tile((3, 4)))
+    white = (1 << bitboard.to_tile((3, 3))) | (1 << bitboard.to_tile((4, 4)))
+    return BLACK_ID, black, white
+
+
+def opening_states(plies):
+    """ Returns the canonical-distinct states reachable from the start within 'plies' moves.
+    """
+    seen = set()
+    states = []
+    frontier = [start_state()]
+    for ply in range(plies + 1):
+        next_frontier = []
+        for current_state in frontier:
+            _, own, opp = current_state
+            canonical_state = canonical(own, opp)[:2]
+            if canonical_state in seen:
+                continue
+            seen.add(canonical_state)
+            states.append(current_state)
+
+            position = Position(current_state)
+            for action in position.actions():
+                position.make(action)
+                next_frontier.append(position.state())
+                position.unmake()
+        frontier = next_frontier
+    return states
+
+
+def build_from_search(path, plies, depth, table_size):
+    """ Searches every position within 'plies' of the start to 'depth' and adds it to the book.
+    """
+    from game.ai import AlphaBetaPruner
+    from game.table import TranspositionTable
+
+    records = read_records(path)
+    table = TranspositionTable(table_size)
+    for current_state in opening_states(plies):
+        if not AlphaBetaPruner.actions(current_state):
+            continue
+        pruner = AlphaBetaPruner(None, depth, None, WHITE if current_state[0] == WHITE_ID else BLACK, table,
+                                 state=current_state)
+        position = pruner.make_position(current_state)
+        score, action = pruner.pvsplit(position, 0, -pruner.infinity, pruner.infinity, None)
+        add_record(records, current_state, action, score)
+    write_records(path, records)
+    return len(records)
+
+
+def build_from_games(path, games, plies, skip=0):
+    """ Adds the first 'plies' moves of self-play records but the first 'skip' to the book, keeping
+        the move played most often in every position. A record is a line of moves, ex: f5d6c3, or a
+        line of the tournament output, which has the moves in its last column.
+    """
+    counts = {}
+    for line in games:
+        moves = line.rstrip('\n').split('\t')[-1].strip()
+        position = Position(start_state())
+        for i in range(0, min(len(moves), 2 * plies), 2):
+            tile = bitboard.to_tile((ord(moves[i]) - ord('a'), ord(moves[i + 1]) - ord('1')))
+            if not position.actions():
+                position.make_pass()
+            if tile not in position.actions():
+                break
+            if i // 2 < skip:
+                position.make(tile)
+                continue
+            key = canonical(position.own, position.opp)
+            move = bitboard.SYMMETRIES[key[2]][tile]
+            counts.setdefault(key[:2], {})
+            counts[key[:2]][move] = counts[key[:2]].get(move, 0) + 1
+            position.make(tile)
+
+    records = read_records(path)
+    for key, moves in counts.items():
+        move, count = max(moves.items(), key=lambda item: item[1])
+        records[key] = move, count
+    write_records(path, records)
+    return len(records)
+
+
+def main():
+    """ Builds or extends an opening book.
+    """
+    from game.table import DEFAULT_TABLE_SIZE
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('book', help="Path of the book file, it is extended when it exists.")
+    parser.add_argument('--plies', help="Number of moves from the start position kept in the book.",
+                        type=int, default=6)
+    parser.add_argument('--depth', help="Depth of the search of every book position.", type=int, default=6)
+    parser.add_argument('--games', help="File of self-play records, one game of moves (ex: f5d6c3) per line "
+                                        "or the output of game.tournament, to learn the book from instead of "
+                                        "searching.")
+    parser.add_argument('--skip', help="Number of opening moves of every game left out of the book, such as "
+                                       "the random moves of a tournament.", type=int, default=0)
+    parser.add_argument('--table-size', help="Max number of positions kept in the transposition table.",
+                        type=int, default=DEFAULT_TABLE_SIZE)
+    args = parser.parse_args()
+
+    if args.games:
+        with open(args.games) as games:
+            size = build_from_games(args.book, games, args.plies, args.skip)
+    else:
+        size = build_from_search(args.book, args.plies, args.depth, args.table_size)
+    print('{0} positions in {1}'.format(size, args.book))
+
+
+if __name__ == '__main__':
+    main()
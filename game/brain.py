@@ -1,26 +1,123 @@
-from mpi4py import MPI
+import queue
 import threading
 from game.ai import AlphaBetaPruner
+from game.endgame import DEFAULT_ENDGAME_EMPTIES
+from game.position import Position
+from game.settings import *
 
 
 class Brain(threading.Thread):
-    def __init__(self, max_depth, mutex, q, pieces, first_player, second_player):
-        self.mutex = mutex
-        self.q = q
+    """Search thread of an AiController, it lives for the whole game.
+
+    Positions to search are handed over with search, and the thread sleeps on its
+    request queue in between. The move found, or the error raised by the search,
+    is put in the result queue for the controller to wait on.
+    """
+
+    def __init__(self, max_depth, first_player, table=None, movetime=None, backend=None,
+                 endgame_empties=DEFAULT_ENDGAME_EMPTIES, evaluator=None):
         self.max_depth = max_depth
-        self.pieces = pieces
         self.first_player = first_player
-        self.second_player = second_player
-        self.has_started = False
-        self.lifetime = None
-        threading.Thread.__init__(self)
+        self.table = table
+        self.movetime = movetime
+        self.backend = backend
+        self.endgame_empties = endgame_empties
+        self.evaluator = evaluator
+        self.requests = queue.Queue()
+        self.results = queue.Queue(1)
+        threading.Thread.__init__(self, daemon=True)
+
+    def search(self, current_state, stats=None):
+        """ Starts the search of a (current_player, own, opp) state, the move is returned by result.
+        """
+        self.requests.put((current_state, stats))
+
+    def result(self, timeout=None):
+        """ Returns the move of the last search as an (x, y) tuple, and raises the error of the search if it failed.
+            Raises queue.Empty when the search is still running after 'timeout' seconds.
+        """
+        result = self.results.get(timeout=timeout)
+        if isinstance(result, Exception):
+            raise result
+        return result
 
     def run(self):
-        """ Starts the Minimax algorithm with the Alpha-Beta Pruning optimization
-            and puts the result in a queue once done.
+        """ Searches the requested states with the Minimax algorithm and the Alpha-Beta Pruning optimization
+            until stop is called.
+
+            With a movetime the search is deepened iteratively until the time is up.
         """
-        pruner = AlphaBetaPruner(self.mutex, self.max_depth, self.pieces, self.first_player)
-        result = pruner.run()
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+
+            current_state, stats = request
+            pruner = AlphaBetaPruner(None, self.max_depth, None, self.first_player, self.table, self.movetime,
+                                     self.backend, state=current_state, endgame_empties=self.endgame_empties,
+                                     stats=stats, evaluator=self.evaluator)
+            try:
+                self.results.put(pruner.run())
+            except Exception as e:
+                self.results.put(e)
+
+    def stop(self):
+        """ Ends the thread once the current search is done.
+        """
+        self.requests.put(None)
+        self.join()
+
 
-        self.q.put(result)
+class Ponderer(threading.Thread):
+    """Searches the replies to the opponent's possible moves while the opponent is thinking.
 
+    The replies are searched in turn, starting with the move the transposition table
+    expects the opponent to play. Completed searches are kept in 'results', keyed by
+    the state after the opponent's move, and everything searched is left in the table.
+    """
+
+    def __init__(self, max_depth, pieces, colour, table, movetime=None, endgame_empties=DEFAULT_ENDGAME_EMPTIES,
+                 evaluator=None):
+        self.max_depth = max_depth
+        self.colour = colour
+        self.table = table
+        self.movetime = movetime
+        self.endgame_empties = endgame_empties
+        self.evaluator = evaluator
+        # The pieces keep changing while the opponent looks for moves, the state is taken right away.
+        self.state = AlphaBetaPruner.pieces_state(pieces, BLACK_ID if colour == WHITE else WHITE_ID)
+        self.results = {}
+        self.stop_event = threading.Event()
+        threading.Thread.__init__(self, daemon=True)
+
+    def run(self):
+        """ Searches the opponent's moves until every one has a reply or stop is called.
+        """
+        position = Position(self.state)
+        actions = position.actions()
+
+        entry = self.table.probe(position.key)
+        if entry is not None and entry[4] in actions:
+            actions.remove(entry[4])
+            actions.insert(0, entry[4])
+
+        for action in actions:
+            position.make(action)
+            state = position.state()
+            position.unmake()
+
+            pruner = AlphaBetaPruner(None, self.max_depth, None, self.colour, self.table, self.movetime,
+                                     state=state, endgame_empties=self.endgame_empties, evaluator=self.evaluator)
+            pruner.split = pruner.serial_split
+            pruner.stop_event = self.stop_event
+            try:
+                if AlphaBetaPruner.actions(state):
+                    self.results[state] = pruner.run()
+            except SearchAborted:
+                return
+
+    def stop(self):
+        """ Stops the search and waits for the thread to finish.
+        """
+        self.stop_event.set()
+        self.join()
@@ -1,11 +1,12 @@
-import datetime
 import os
 import queue
-import threading
 import sys
 from game.ai import AlphaBetaPruner
-from game.brain import Brain
+from game.brain import Brain, Ponderer
+from game.endgame import DEFAULT_ENDGAME_EMPTIES
+from game.stats import SearchStats
 from game.settings import *
+from game.table import TranspositionTable, DEFAULT_TABLE_SIZE
 
 
 class Controller(object):
@@ -22,6 +23,11 @@ class Controller(object):
         """
         pass
 
+    def close(self):
+        """ Releases what the controller holds once the game is over.
+        """
+        pass
+
 
 class PlayerController(Controller):
     """ Controller for a real, alive and kicking player.
@@ -82,56 +88,111 @@ class PlayerController(Controller):
         return ord(x) - ord('a'), ord(y) - ord('0') - 1
 
 
-stdoutmutex = threading.Lock()
-workQueue = queue.Queue(1)
-threads = []
+# Seconds between the dots printed while the ai is thinking.
+PROGRESS_INTERVAL = 0.1
 
 
 class AiController(Controller):
     """ Artificial Intelligence Controller.
     """
 
-    def __init__(self, id, colour, max_depth):
+    def __init__(self, id, colour, max_depth, table_size=DEFAULT_TABLE_SIZE, movetime=None, backend=None,
+                 book=None, endgame_empties=DEFAULT_ENDGAME_EMPTIES, stats=False, evaluator=None, headless=False):
         self.id = id
         self.colour = colour
         self.max_depth = max_depth
+        self.table = TranspositionTable(table_size)
+        self.movetime = movetime
+        self.backend = backend
+        self.book = book
+        self.endgame_empties = endgame_empties
+        self.stats = stats
+        self.evaluator = evaluator
+        self.headless = headless
+        self.last_stats = None
+        self.brain = None
+        self.ponderer = None
+        self.pondered = {}
+
+    def start_pondering(self, board):
+        """ Starts searching the replies to the opponent's moves while it is its turn.
+        """
+        self.ponderer = Ponderer(self.max_depth, board.pieces, self.colour, self.table, self.movetime,
+                                 self.endgame_empties, self.evaluator)
+        self.ponderer.start()
+
+    def stop_pondering(self):
+        """ Stops pondering, the replies it found are used by the next call to next_move.
+        """
+        if self.ponderer is not None:
+            self.ponderer.stop()
+            self.pondered = self.ponderer.results
+            self.ponderer = None
 
     def next_move(self, board):
         """ Will return a single valid move as an (x, y) tuple.
 
-            Will create a new Brain to start a Minimax calculation with
-            the Alpha-Beta Pruning optimization to find optimal moves based
+            Will hand the position to the Brain, which runs a Minimax calculation
+            with the Alpha-Beta Pruning optimization to find optimal moves based
             on an evaluation function, in another thread.
 
-            Meanwhile the AiController will output to stdout to show
-            that it hasn't crashed.
-        """
+            Meanwhile the AiController waits for the move and outputs a dot to
+            stdout every PROGRESS_INTERVAL seconds to show that it hasn't crashed,
+            unless it is headless, then it prints nothing.
 
-        brain = Brain(self.max_depth, stdoutmutex, workQueue, board.pieces, self.colour,
-                      BLACK if self.colour is WHITE else WHITE)
-        brain.start()
+            If the move is in the opening book, or was already found while
+            pondering, it is returned at once.
 
-        threads.append(brain)
+            With stats on, the statistics of the search are left in 'last_stats'.
+        """
+        self.last_stats = None
+        pondered, self.pondered = self.pondered, {}
+        state = AlphaBetaPruner.pieces_state(board.pieces, WHITE_ID if self.colour == WHITE else BLACK_ID)
+        if state in pondered:
+            self.say('Brain pondered this move')
+            return pondered[state]
+
+        if self.book is not None:
+            move = self.book.lookup(state)
+            if move is not None:
+                self.say('Brain found this move in the book')
+                return move
+
+        if self.stats:
+            self.last_stats = SearchStats()
+        if self.brain is None:
+            self.brain = Brain(self.max_depth, self.colour, self.table, self.movetime, self.backend,
+                               self.endgame_empties, self.evaluator)
+            self.brain.start()
+        self.brain.search(state, self.last_stats)
+        if self.headless:
+            return self.brain.result()
 
         print('Brain is thinking ', end='')
-        update_step_duration = datetime.timedelta(microseconds=10000)
-        goal_time = datetime.datetime.now() + update_step_duration
-        accumulated_time = datetime.datetime.now()
-
-        while workQueue.empty():
-            if accumulated_time >= goal_time:
+        sys.stdout.flush()
+        while True:
+            try:
+                move = self.brain.result(timeout=PROGRESS_INTERVAL)
+                break
+            except queue.Empty:
                 print('.', end='')
-                goal_time = datetime.datetime.now() + update_step_duration
                 sys.stdout.flush()
 
-            accumulated_time = datetime.datetime.now()
-
         print()
+        return move
 
-        for thread in threads:
-            thread.join()
+    def say(self, message):
+        """ Prints a message unless the controller is headless.
+        """
+        if not self.headless:
+            print(message)
 
-        return workQueue.get()
+    def close(self):
+        """ Stops the search thread.
+        """
+        if self.brain is not None:
+            self.brain.stop()
+            self.brain = None
 
     def get_colour(self):
         """ Returns the colour of the controller.
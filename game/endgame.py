@@ -0,0 +1,133 @@
+"""
+Exact solver for the end of the game.
+
+With few empty tiles left the whole tree can be searched, the solver plays
+every line to the end of the game and returns the final disc difference for
+the player to move, with the empty tiles counted for the winner.
+"""
+from game.settings import *
+from game import bitboard
+
+DEFAULT_ENDGAME_EMPTIES = 8
+
+# Number of empty tiles above the exact solve where the search first looks for a move winning,
+# or else drawing, with the much cheaper win/loss/draw search.
+WLD_EXTRA_EMPTIES = 4
+
+# Value of one disc of the exact result in the scale of the evaluation. The table and pattern
+# weights use the same unit but are not bounded by 64 discs: the default table weights value a
+# corner at 5 discs, so a narrowly won position can score below a promising one. The terms
+# evaluation is on a raw scale of a few units, far below one disc, so when it shares a tree with
+# exact results every won line scores above every evaluated one and every lost line below.
+DISC_SCORE = 100
+
+# Tiles touching each tile, a tile without an opponent disc next to it can not be a move.
+NEIGHBOURS = tuple(sum(1 << ray[0] for ray in rays.values() if ray) for rays in RAYS)
+
+# The four quadrants of the board, used for the parity of the empty regions.
+QUADRANTS = tuple(sum(1 << bitboard.to_tile((x, y))
+                      for x in range(qx, qx + WIDTH // 2) for y in range(qy, qy + HEIGHT // 2))
+                  for qy in (0, HEIGHT // 2) for qx in (0, WIDTH // 2))
+
+# Below this number of empty tiles moves are ordered by parity only, above it the
+# move leaving the opponent the fewest replies is searched first.
+FASTEST_FIRST_EMPTIES = 6
+
+
+class EndgameSolver(object):
+    """Exact alpha-beta search to the end of the game."""
+
+    def __init__(self, interrupt=None):
+        self.nodes = 0
+        self.interrupt = interrupt
+
+    def solve(self, own, opp, alpha=-WIDTH * HEIGHT, beta=WIDTH * HEIGHT):
+        """ Returns the final disc difference for the player owning 'own' with perfect play,
+            an upper bound when it is at most alpha and a lower bound when it is at least beta.
+        """
+        return self.search(own, opp, alpha, beta, False)
+
+    def win_loss_draw(self, own, opp):
+        """ Returns 1 for a win, 0 for a draw and -1 for a loss of the player owning 'own'.
+        """
+        score = self.search(own, opp, -1, 1, False)
+        return 1 if score > 0 else -1 if score < 0 else 0
+
+    def winning_move(self, own, opp):
+        """ Returns a (result, tile) tuple of a winning move for the player owning 'own', or else of
+            a drawing move, the result as in win_loss_draw. The tile is None when every move loses.
+        """
+        best_result, best_tile = -1, None
+        for tile, flips in self.moves(own, opp):
+            result = -self.win_loss_draw(opp ^ flips, own | flips | (1 << tile))
+            if result > best_result:
+                best_result, best_tile = result, tile
+                if result == 1:
+                    break
+        return best_result, best_tile
+
+    def best_move(self, own, opp):
+        """ Returns a (score, tile) tuple of the best move for the player owning 'own'.
+        """
+        best_score, best_tile = -WIDTH * HEIGHT - 1, None
+        for tile, flips in self.moves(own, opp):
+            score = -self.search(opp ^ flips, own | flips | (1 << tile), -WIDTH * HEIGHT, -best_score, False)
+            if score > best_score:
+                best_score, best_tile = score, tile
+        return best_score, best_tile
+
+    def moves(self, own, opp):
+        """ Returns the (tile, flips) tuples of the legal moves, in the order they should be searched.
+        """
+        empty = ~(own | opp) & bitboard.FULL
+        moves = []
+        for tile in bitboard.tiles(empty):
+            if NEIGHBOURS[tile] & opp:
+                flips = bitboard.get_flips(own, opp, tile)
+                if flips:
+                    moves.append((tile, flips))
+
+        if len(moves) < 2:
+            return moves
+
+        if bitboard.count(empty) > FASTEST_FIRST_EMPTIES:
+            moves.sort(key=lambda move: bitboard.count(bitboard.get_moves(opp ^ move[1], own | move[1] | (1 << move[0]))))
+        else:
+            # Tiles in a region with an odd number of empty tiles first.
+            odd = 0
+            for quadrant in QUADRANTS:
+                if bitboard.count(empty & quadrant) & 1:
+                    odd |= quadrant
+            moves.sort(key=lambda move: not odd >> move[0] & 1)
+        return moves
+
+    def search(self, own, opp, alpha, beta, passed):
+        self.nodes += 1
+        if self.interrupt is not None and self.nodes & 1023 == 0:
+            self.interrupt()
+
+        moves = self.moves(own, opp)
+        if not moves:
+            if passed:
+                return self.final_score(own, opp)
+            return -self.search(opp, own, -beta, -alpha, True)
+
+        for tile, flips in moves:
+            score = -self.search(opp ^ flips, own | flips | (1 << tile), -beta, -alpha, False)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    @staticmethod
+    def final_score(own, opp):
+        """ Returns the disc difference at the end of the game, the empty tiles go to the winner.
+        """
+        own_discs, opp_discs = bitboard.count(own), bitboard.count(opp)
+        empty = WIDTH * HEIGHT - own_discs - opp_discs
+        if own_discs > opp_discs:
+            return own_discs - opp_discs + empty
+        if own_discs < opp_discs:
+            return own_discs - opp_discs - empty
+        return 0
@@ -0,0 +1,153 @@
+"""
+Evaluators scoring the leaves of the search for the player to move.
+
+'terms' is the evaluation kept by Position as running totals: the disc, corner, edge
+and positional terms with fixed coefficients.
+
+'table' scores a position with a weight for every square and a weight for mobility
+(the number of moves of the player minus those of its opponent), both depending on
+the phase of the game. The weights are read from a weight file, a JSON object:
+
+    {"phases": [{"empties": [45, 64], "squares": [64 weights, a1 to h8], "mobility": 60}, ...]}
+
+where every phase covers a range of empty tile counts, and every count from 0 to 64
+belongs to exactly one phase. The weights are in DISC_SCORE units, 100 for a disc.
+Squares with the same weight are looked up as one mask, so a leaf costs a few bit
+counts instead of a walk over the board.
+
+'pattern' scores configurations of discs instead of single squares, see game.patterns.
+
+    python -m game.evaluation weights.json    writes the default weights, to edit or tune
+"""
+import argparse
+import json
+from game import bitboard
+from game.settings import *
+
+EVALUATORS = ('terms', 'table', 'pattern')
+DEFAULT_EVALUATOR = 'table'
+
+# Every square belongs to the class of its smallest image under the 8 symmetries of the board:
+# a1, b1, c1, d1, b2, c2, d2, c3, d3 and d4.
+SQUARE_CLASSES = tuple(min(symmetry[tile] for symmetry in bitboard.SYMMETRIES) for tile in range(WIDTH * HEIGHT))
+CLASS_SQUARES = tuple(sorted(set(SQUARE_CLASSES)))
+CLASS_MASKS = tuple(sum(1 << tile for tile in range(WIDTH * HEIGHT) if SQUARE_CLASSES[tile] == square)
+                    for square in CLASS_SQUARES)
+
+
+def symmetric_squares(weights):
+    """ Returns the 64 square weights of a weight for each of the 10 square classes.
+    """
+    by_class = dict(zip(CLASS_SQUARES, weights))
+    return [by_class[SQUARE_CLASSES[tile]] for tile in range(WIDTH * HEIGHT)]
+
+
+#                             a1   b1  c1  d1   b2  c2  d2  c3  d3  d4
+DEFAULT_WEIGHTS = {'phases': [
+    {'empties': [45, 64], 'mobility': 60, 'squares': symmetric_squares(
+        (500, -100, 50, 25, -250, -10, -10, -5, -5, 0))},
+    {'empties': [20, 44], 'mobility': 40, 'squares': symmetric_squares(
+        (500, -80, 50, 25, -200, -10, -10, 0, 0, 0))},
+    {'empties': [0, 19], 'mobility': 20, 'squares': symmetric_squares(
+        (300, 60, 100, 100, 20, 80, 80, 100, 100, 100))},
+]}
+
+
+def load_weights(path):
+    """ Returns the weights read from a weight file, see write_weights.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_weights(path, weights):
+    """ Writes the weights to a weight file, one phase per line.
+    """
+    with open(path, 'w') as f:
+        f.write('{"phases": [\n')
+        f.write(',\n'.join(json.dumps(phase) for phase in weights['phases']))
+        f.write('\n]}\n')
+
+
+class TermsEvaluator(object):
+    """Evaluates with the running terms of the Position."""
+
+    name = 'terms'
+
+    def attach(self, position):
+        """ Prepares a position to be searched, the running terms are always kept.
+        """
+        pass
+
+    def evaluate(self, position):
+        """ Returns the score of the position for the player to move.
+        """
+        return position.evaluation(position.player)
+
+
+class TableEvaluator(TermsEvaluator):
+    """Evaluates with per phase square and mobility weights."""
+
+    name = 'table'
+
+    def __init__(self, weights=None):
+        weights = weights if weights is not None else DEFAULT_WEIGHTS
+        by_empties = [None] * (WIDTH * HEIGHT + 1)
+
+        for phase in weights['phases']:
+            squares = phase['squares']
+            if len(squares) != WIDTH * HEIGHT:
+                raise ValueError('A phase has {0} square weights instead of {1}'.format(len(squares),
+                                                                                      WIDTH * HEIGHT))
+            masks = {}
+            for tile, weight in enumerate(squares):
+                masks[round(weight)] = masks.get(round(weight), 0) | (1 << tile)
+            entry = tuple((weight, mask) for weight, mask in masks.items() if weight), round(phase['mobility'])
+
+            low, high = phase['empties']
+            for empties in range(low, high + 1):
+                if by_empties[empties] is not None:
+                    raise ValueError('{0} empty tiles are in more than one phase'.format(empties))
+                by_empties[empties] = entry
+
+        if None in by_empties:
+            raise ValueError('{0} empty tiles are in no phase'.format(by_empties.index(None)))
+        self.by_empties = by_empties
+
+    def evaluate(self, position):
+        """ Returns the score of the position for the player to move.
+        """
+        masks, mobility = self.by_empties[position.empties]
+        own, opp = position.own, position.opp
+        score = 0
+        for weight, mask in masks:
+            score += weight * (bitboard.count(own & mask) - bitboard.count(opp & mask))
+        if mobility:
+            score += mobility * (bitboard.count(bitboard.get_moves(own, opp)) -
+                                 bitboard.count(bitboard.get_moves(opp, own)))
+        return score
+
+
+def make_evaluator(name=DEFAULT_EVALUATOR, weights_path=None):
+    """ Returns the evaluator called 'name', a table evaluator reads its weights from 'weights_path'
+        and a pattern evaluator its pattern file, when given.
+    """
+    if name == 'terms':
+        return TermsEvaluator()
+    if name == 'table':
+        return TableEvaluator(load_weights(weights_path) if weights_path else None)
+    if name == 'pattern':
+        from game.patterns import PatternEvaluator
+        return PatternEvaluator(weights_path)
+    raise ValueError('Unknown evaluator {0}'.format(name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes the default weights of the table evaluator.")
+    parser.add_argument('path', help="Weight file to write.")
+    args = parser.parse_args()
+    write_weights(args.path, DEFAULT_WEIGHTS)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,10 @@
-import os
-from mpi4py import MPI
 from collections import deque
 from game.board import Board
 from game.controllers import PlayerController, AiController
+from game.endgame import DEFAULT_ENDGAME_EMPTIES
+from game.render import Renderer
 from game.settings import *
-
-COMM = MPI.COMM_WORLD
-SIZE = COMM.Get_size()
+from game.table import DEFAULT_TABLE_SIZE
 
 
 class Game(object):
@@ -16,10 +14,32 @@ class Game(object):
     def __init__(self, max_depth=1000,
                  display_moves=True,
                  players=['ai', 'ai'],
-                 colour=False):
+                 colour=False,
+                 table_size=DEFAULT_TABLE_SIZE,
+                 movetime=None,
+                 backend=None,
+                 ponder=False,
+                 book=None,
+                 endgame_empties=DEFAULT_ENDGAME_EMPTIES,
+                 stats=False,
+                 stats_file=None,
+                 headless=False,
+                 evaluator=None):
 
         self.board = Board(colour)
         self.max_depth = max_depth
+        self.table_size = table_size
+        self.movetime = movetime
+        self.backend = backend
+        self.ponder = ponder
+        self.book = book
+        self.endgame_empties = endgame_empties
+        self.evaluator = evaluator
+        self.stats = stats or stats_file is not None
+        self.stats_file = stats_file
+        self.last_stats = None
+        self.headless = headless
+        self.renderer = None if headless else Renderer(colour)
         self.ai_counter = 0
         self.list_of_colours = [BLACK, WHITE]
         self.players = players
@@ -42,50 +62,44 @@ class Game(object):
             return PlayerController(colour)
         else:
             self.ai_counter += 1
-            return AiController(self.ai_counter, colour, self.max_depth)
+            return AiController(self.ai_counter, colour, self.max_depth, self.table_size, self.movetime,
+                                self.backend, self.book, self.endgame_empties, self.stats, self.evaluator,
+                                self.headless)
 
-    def show_info(self):
-        """ Prints game information to stdout.
-        """
-        print("Playing as:       " + self.player)
-        print("Displaying moves: " + str(self.display_moves))
-        print("Current turn:     " + str(self.controllers[0]))
-        print("Number of Black:  " + str(
-            len([p for p in self.board.pieces if p.get_state() == BLACK])))
-        print("Number of White:  " + str(
-            len([p for p in self.board.pieces if p.get_state() == WHITE])))
-
-    def show_board(self):
-        """ Prints the current state of the board to stdout.
+    def info(self, moves):
+        """ Returns the lines of game information shown below the board.
         """
-        self.player = self.controllers[0].get_colour()
-        self.board.mark_moves(self.player)
-        print(self.board.draw())
-
-    def show_commands(self):
-        """ Prints the possible moves to stdout.
-        """
-        moves = [self.to_board_coordinates(piece.get_position()) for piece in self.board.get_move_pieces(self.player)]
-
-        if not moves:
-            raise NoMovesError
-
-        print("Possible moves are: ", moves)
-        self.board.clear_moves()
+        lines = ["Playing as:       " + self.player,
+                 "Displaying moves: " + str(self.display_moves),
+                 "Current turn:     " + str(self.controllers[0]),
+                 "Number of Black:  " + str(len([p for p in self.board.pieces if p.get_state() == BLACK])),
+                 "Number of White:  " + str(len([p for p in self.board.pieces if p.get_state() == WHITE]))]
+        if self.previous_move is not None:
+            lines.append("Previous move:    " + self.to_board_coordinates(self.previous_move))
+        if self.last_stats is not None:
+            lines.append(self.last_stats.report())
+        if moves:
+            lines.append("Possible moves are:  " + str([self.to_board_coordinates(move) for move in moves]))
+        return lines
 
     def run(self):
-        """ The game loop will print game information, the board, the possible moves, and then wait for the
+        """ The game loop will show game information, the board, the possible moves, and then wait for the
             current player to make its decision before it processes it and then goes on repeating itself.
+
+            Headless games show nothing but the result.
         """
         while True:
-            os.system('clear')
-            self.show_info()
-            self.show_board()
+            self.player = self.controllers[0].get_colour()
+            moves = [piece.get_position() for piece in self.board.get_move_pieces(self.player)]
+            if self.renderer is not None:
+                self.renderer.draw(self.board, moves, self.info(moves))
 
             try:
-                self.show_commands()
-                next_move = self.controllers[0].next_move(self.board)
+                if not moves:
+                    raise NoMovesError
+                next_move = self.next_move()
                 self.board.make_move(next_move, self.controllers[0].get_colour())
+                self.record_stats(self.controllers[0])
             except NoMovesError:
                 print("Game Over")
                 blacks = len([p for p in self.board.pieces if p.get_state() == BLACK])
@@ -103,12 +117,37 @@ class Game(object):
 
             self.controllers.rotate()
 
-            print("Current move is: ", self.to_board_coordinates(next_move))
-
             self.previous_move = next_move
 
-        for i in range(1, SIZE):
-            COMM.isend(-1, dest=i, tag=1)
+        for controller in self.controllers:
+            controller.close()
+
+    def next_move(self):
+        """ Returns the move of the current controller. When a player is up against an ai
+            and pondering is on, the ai searches its replies while the player is thinking.
+        """
+        current, opponent = self.controllers[0], self.controllers[1]
+        pondering = self.ponder and isinstance(current, PlayerController) and isinstance(opponent, AiController)
+
+        if pondering:
+            opponent.start_pondering(self.board)
+        try:
+            return current.next_move(self.board)
+        finally:
+            if pondering:
+                opponent.stop_pondering()
+
+    def record_stats(self, controller):
+        """ Keeps the statistics of the search of the last ai move to be shown,
+            and adds them as a line of JSON to the statistics file.
+        """
+        if not self.stats or not isinstance(controller, AiController):
+            return
+
+        self.last_stats = controller.last_stats
+        if self.last_stats is not None and self.stats_file is not None:
+            self.stats_file.write(self.last_stats.to_json() + '\n')
+            self.stats_file.flush()
 
     def to_board_coordinates(self, coordinate):
         """ Transforms an (x, y) tuple into (a-h, 1-8) tuple.
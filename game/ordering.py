@@ -0,0 +1,54 @@
+"""
+Move ordering of the search.
+
+The moves of a node are searched in this order:
+  1. the move of the principal variation or of the transposition table,
+  2. the killer moves of the ply, the last two moves that caused a cutoff at that depth,
+  3. the other moves by their history score, the number of cutoffs they caused weighted by
+     the depth left, and then by their static priority: corners first, X-squares last.
+
+The killers and the history are kept by the pruner for the whole search, so every
+iteration of iterative deepening starts from what the previous ones learned.
+"""
+from game.position import MAX_PLY
+from game.settings import *
+
+# Static priority of every tile, the corners are the best moves and the X-squares
+# (diagonally next to a corner) the worst.
+SQUARE_PRIORITY = SQUARE_WEIGHTS
+
+KILLER_SLOTS = 2
+
+
+class MoveOrdering(object):
+    """Killer moves per ply and a history table per player, updated by the cutoffs of a search."""
+
+    def __init__(self):
+        self.killers = [[None] * KILLER_SLOTS for _ in range(MAX_PLY)]
+        self.history = {WHITE_ID: [0] * (WIDTH * HEIGHT), BLACK_ID: [0] * (WIDTH * HEIGHT)}
+
+    def order(self, actions, depth, player, first=None):
+        """ Sorts the list of tiles 'actions' of 'player' at 'depth' in place, best first,
+            and returns it. 'first' is the move of the transposition table, or None.
+        """
+        history = self.history[player]
+        actions.sort(key=lambda tile: (history[tile], SQUARE_PRIORITY[tile]), reverse=True)
+
+        for killer in reversed(self.killers[depth]):
+            if killer is not None and killer != first and killer in actions:
+                actions.remove(killer)
+                actions.insert(0, killer)
+
+        if first is not None and first in actions:
+            actions.remove(first)
+            actions.insert(0, first)
+        return actions
+
+    def cutoff(self, action, depth, remaining, player):
+        """ Records that 'action' of 'player' caused a cutoff at 'depth' with 'remaining' plies left to search.
+        """
+        killers = self.killers[depth]
+        if killers[0] != action:
+            killers[1:] = killers[:-1]
+            killers[0] = action
+        self.history[player][action] += (remaining + 1) * (remaining + 1)
@@ -0,0 +1,256 @@
+"""
+Pattern evaluation: configurations of discs looked up in precomputed tables.
+
+The board is covered by the instances of four patterns, the 4 edges, the 4 corner
+3x3 blocks, the 2 long diagonals and the 4 blocks of 2x2 tiles between the corner
+blocks (d2 e2 d3 e3 and its images), so every square is in at least one. The instances of a pattern are images of each
+other under the symmetries of the board and share one table. A configuration is
+indexed in base 3, a digit per tile of the pattern (0 empty, 1 black, 2 white),
+and the table holds its score for black in DISC_SCORE units.
+
+The indices of a Position are kept up to date by every make and unmake, so a leaf
+costs one table lookup per instance.
+
+A pattern file is a header (magic and number of phases), the range of empty tiles
+of every phase, and then the tables of every phase as little-endian 16 bit
+integers, edge, corner, diagonal and block. The file is memory-mapped read-only, every
+process using the same file on a host shares its pages.
+
+    python -m game.patterns patterns.bin [--weights weights.json]
+
+writes a pattern file scoring every configuration by the square weights of a weight
+file (see game.evaluation), or of the default weights.
+"""
+import argparse
+import array
+import mmap
+import struct
+import sys
+from game import bitboard
+from game.evaluation import DEFAULT_WEIGHTS, load_weights
+from game.position import MAX_PLY
+from game.settings import *
+
+HEADER_FORMAT = struct.Struct('<8sHxxxxxx')
+PHASE_FORMAT = struct.Struct('<BB')
+MAGIC = b'RVPATT2\0'
+
+BLACK_DIGIT, WHITE_DIGIT = 1, 2
+
+
+def _images(coordinates):
+    """ Returns the tiles of the images of a pattern, given as (x, y) tuples, under 'flip x',
+        'flip y' and 'flip both'.
+    """
+    last = WIDTH - 1
+    maps = (lambda x, y: (x, y), lambda x, y: (last - x, y), lambda x, y: (x, last - y),
+            lambda x, y: (last - x, last - y))
+    return [tuple(x + y * WIDTH for x, y in (f(x, y) for x, y in coordinates)) for f in maps]
+
+
+# Every pattern is a list of instances, every instance the tiles of its digits, lowest first.
+_EDGE = [(x, 0) for x in range(WIDTH)]
+_BLOCK = [(x, y) for y in (1, 2) for x in (3, 4)]
+PATTERNS = (
+    ('edge', _images(_EDGE)[::2] + _images([(y, x) for x, y in _EDGE])[:2]),
+    ('corner', _images([(x, y) for y in range(3) for x in range(3)])),
+    ('diagonal', _images([(i, i) for i in range(WIDTH)])[:2]),
+    ('block', _images(_BLOCK)[::2] + _images([(y, x) for x, y in _BLOCK])[:2]),
+)
+PATTERN_SIZES = tuple(3 ** len(instances[0]) for _, instances in PATTERNS)
+INSTANCES = tuple(instance for _, instances in PATTERNS for instance in instances)
+# INSTANCE_PATTERN[i] is the number of the pattern of instance i.
+INSTANCE_PATTERN = tuple(number for number, (_, instances) in enumerate(PATTERNS) for _ in instances)
+
+# TILE_DIGITS[tile] lists the (instance, power of 3) of every digit the tile is in.
+TILE_DIGITS = tuple(tuple((i, 3 ** instance.index(tile)) for i, instance in enumerate(INSTANCES) if tile in instance)
+                    for tile in range(WIDTH * HEIGHT))
+
+
+def indices(black, white):
+    """ Returns the list of the index of every instance for the bitboards of the black and white discs.
+    """
+    result = [0] * len(INSTANCES)
+    for bits, digit in ((black, BLACK_DIGIT), (white, WHITE_DIGIT)):
+        for tile in bitboard.tiles(bits):
+            for i, power in TILE_DIGITS[tile]:
+                result[i] += digit * power
+    return result
+
+
+def _colours(current_state):
+    """ Returns the (black, white) bitboards of a (current_player, own, opp) state.
+    """
+    player, own, opp = current_state
+    return (own, opp) if player == BLACK_ID else (opp, own)
+
+
+class PatternIndices(object):
+    """The indices of the instances of a Position, updated by its make and unmake.
+
+    The indices of every ply are kept in lists allocated once, like the undo arrays
+    of the Position, so making a move copies into the list of the next ply and
+    unmaking it only goes back to the list of the previous one.
+    """
+
+    def __init__(self, current_state):
+        self.plies = [[0] * len(INSTANCES) for _ in range(MAX_PLY + 1)]
+        self.plies[0][:] = indices(*_colours(current_state))
+        self.indices = self.plies[0]
+
+    def make(self, ply, player, tile, flips):
+        """ Updates the indices for 'player' (an id) playing on 'tile' and flipping 'flips' at 'ply'.
+        """
+        result = self.plies[ply + 1]
+        result[:] = self.indices
+        self.indices = result
+        digit, flip = (BLACK_DIGIT, BLACK_DIGIT - WHITE_DIGIT) if player == BLACK_ID \
+            else (WHITE_DIGIT, WHITE_DIGIT - BLACK_DIGIT)
+
+        for i, power in TILE_DIGITS[tile]:
+            result[i] += digit * power
+        while flips:
+            low = flips & -flips
+            for i, power in TILE_DIGITS[low.bit_length() - 1]:
+                result[i] += flip * power
+            flips ^= low
+
+    def unmake(self, ply):
+        """ Takes back the move made at 'ply'.
+        """
+        self.indices = self.plies[ply]
+
+
+def pattern_tables(weights):
+    """ Returns the list of ((low, high) empties, tables) phases of the pattern tables that score every
+        configuration by the square weights of every phase of 'weights' (see game.evaluation), shared
+        out between the instances covering a square. Mobility has no pattern and is left out.
+    """
+    coverage = [len(digits) for digits in TILE_DIGITS]
+    phases = []
+    for phase in weights['phases']:
+        squares = phase['squares']
+        tables = []
+        for (_, instances), size in zip(PATTERNS, PATTERN_SIZES):
+            shares = [squares[tile] / coverage[tile] for tile in instances[0]]
+            table = array.array('h', bytes(2 * size))
+            for index in range(size):
+                score, rest = 0.0, index
+                for share in shares:
+                    rest, digit = divmod(rest, 3)
+                    score += share if digit == BLACK_DIGIT else -share if digit == WHITE_DIGIT else 0
+                table[index] = round(score)
+            tables.append(table)
+        phases.append((tuple(phase['empties']), tables))
+    return phases
+
+
+def write_patterns(path, phases):
+    """ Writes the phases of pattern tables, see pattern_tables, to a pattern file.
+    """
+    with open(path, 'wb') as f:
+        f.write(HEADER_FORMAT.pack(MAGIC, len(phases)))
+        for (low, high), _ in phases:
+            f.write(PHASE_FORMAT.pack(low, high))
+        f.write(bytes(-f.tell() % 8))
+        for _, tables in phases:
+            for table in tables:
+                if sys.byteorder != 'little':
+                    table = array.array('h', table)
+                    table.byteswap()
+                f.write(table.tobytes())
+
+
+def read_patterns(data):
+    """ Returns the phases of pattern tables stored in the bytes of a pattern file. The tables are
+        views of 'data' when the byte order of the host is little-endian, and copies otherwise.
+    """
+    if len(data) < HEADER_FORMAT.size:
+        raise ValueError('Not a pattern file')
+    magic, count = HEADER_FORMAT.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('Not a pattern file')
+
+    offset = HEADER_FORMAT.size + count * PHASE_FORMAT.size
+    offset += -offset % 8
+    expected = offset + count * 2 * sum(PATTERN_SIZES)
+    if len(data) != expected:
+        raise ValueError('The pattern file has {0} bytes instead of {1}'.format(len(data), expected))
+
+    ranges = [PHASE_FORMAT.unpack_from(data, HEADER_FORMAT.size + i * PHASE_FORMAT.size) for i in range(count)]
+
+    view = memoryview(data)
+    phases = []
+    for low, high in ranges:
+        tables = []
+        for size in PATTERN_SIZES:
+            table = view[offset:offset + 2 * size]
+            if sys.byteorder == 'little':
+                table = table.cast('h')
+            else:
+                table = array.array('h', table)
+                table.byteswap()
+            tables.append(table)
+            offset += 2 * size
+        phases.append(((low, high), tables))
+    return phases
+
+
+class PatternEvaluator(object):
+    """Evaluates with the pattern tables of a pattern file, or of the default weights without one."""
+
+    name = 'pattern'
+
+    def __init__(self, path=None):
+        self.path = path
+        if path is None:
+            phases = pattern_tables(DEFAULT_WEIGHTS)
+        else:
+            with open(path, 'rb') as f:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            phases = read_patterns(self.data)
+
+        # by_empties[empties] has the table of every instance.
+        by_empties = [None] * (WIDTH * HEIGHT + 1)
+        for (low, high), tables in phases:
+            if not 0 <= low <= high <= WIDTH * HEIGHT:
+                raise ValueError('{0}-{1} is not a range of empty tile counts'.format(low, high))
+            instance_tables = tuple(tables[number] for number in INSTANCE_PATTERN)
+            for empties in range(low, high + 1):
+                if by_empties[empties] is not None:
+                    raise ValueError('{0} empty tiles are in more than one phase'.format(empties))
+                by_empties[empties] = instance_tables
+        if None in by_empties:
+            raise ValueError('{0} empty tiles are in no phase'.format(by_empties.index(None)))
+        self.by_empties = by_empties
+
+    def __reduce__(self):
+        # The tables are read again from the file, or made again, in the processes it is sent to.
+        return PatternEvaluator, (self.path,)
+
+    def attach(self, position):
+        """ Keeps the indices of the position up to date while the search makes and unmakes moves.
+        """
+        position.patterns = PatternIndices(position.state())
+
+    def evaluate(self, position):
+        """ Returns the score of the position for the player to move.
+        """
+        patterns = position.patterns
+        current = patterns.indices if patterns is not None else indices(*_colours(position.state()))
+        score = 0
+        for table, index in zip(self.by_empties[position.empties], current):
+            score += table[index]
+        return score if position.player == BLACK_ID else -score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes a pattern file scoring the configurations by square weights.")
+    parser.add_argument('path', help="Pattern file to write.")
+    parser.add_argument('--weights', help="Weight file of the square weights, the default weights when left out.")
+    args = parser.parse_args()
+    write_patterns(args.path, pattern_tables(load_weights(args.weights) if args.weights else DEFAULT_WEIGHTS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Perft, the number of move sequences of a given length, to check and time move generation.
+
+A pass is a move: a player without a move passes and the sequence goes on,
+and a game that ends before the depth is reached counts as a single sequence.
+
+Every move generator of the game is counted the same way:
+    board    - Board.get_move_pieces and Board.make_move, the objects the game is drawn from
+    pruner   - AlphaBetaPruner.actions and AlphaBetaPruner.next_state, on state tuples
+    position - Position.make and Position.unmake, what the search uses
+"""
+import argparse
+import time
+from game import bitboard
+from game.ai import AlphaBetaPruner
+from game.board import Board
+from game.book import start_state
+from game.position import Position
+from game.settings import *
+
+PATHS = ('board', 'pruner', 'position')
+
+
+def corpus_state(player, black, white):
+    """ Returns the (current_player, own, opp) state of the black and white bitboards.
+    """
+    return (player, black, white) if player == BLACK_ID else (player, white, black)
+
+
+# Positions reached by random games, with their perft counts, (name, state, {depth: count}).
+# The counts of the start position are the published ones, 'passes' has passes within 4 moves.
+CORPUS = (
+    ('start', start_state(),
+     {1: 4, 2: 12, 3: 56, 4: 244, 5: 1396, 6: 8200, 7: 55092, 8: 390216, 9: 3005288, 10: 24571284}),
+    ('opening', corpus_state(BLACK_ID, 0x200a0e0c080808, 0x111b141010100402),
+     {1: 11, 2: 133, 3: 1464, 4: 16834, 5: 186331, 6: 2131394}),
+    ('middle', corpus_state(BLACK_ID, 0x191e34387c3e4080, 0x20000a0703010000),
+     {1: 3, 2: 33, 3: 174, 4: 2153, 5: 15548, 6: 194093}),
+    ('late', corpus_state(BLACK_ID, 0xe0786020000b243e, 0x3171f7ef41800),
+     {1: 8, 2: 85, 3: 761, 4: 7757, 5: 67848, 6: 647380}),
+    ('passes', corpus_state(BLACK_ID, 0x201880d4acc080, 0xf81f067f2b533f5c),
+     {1: 9, 2: 33, 3: 268, 4: 694, 5: 4594, 6: 11336, 7: 56936, 8: 126276}),
+)
+
+
+def perft_position(position, depth, passed=False):
+    """ Returns the number of move sequences of 'depth' moves from the position.
+    """
+    if depth == 0:
+        return 1
+
+    actions = position.actions()
+    if not actions:
+        if passed:
+            return 1
+        position.make_pass()
+        count = perft_position(position, depth - 1, True)
+        position.unmake_pass()
+        return count
+
+    if depth == 1:
+        return len(actions)
+
+    count = 0
+    for action in actions:
+        position.make(action)
+        count += perft_position(position, depth - 1)
+        position.unmake()
+    return count
+
+
+def perft_pruner(current_state, depth, passed=False):
+    """ Returns the number of move sequences of 'depth' moves from a (current_player, own, opp) state.
+    """
+    if depth == 0:
+        return 1
+
+    actions = AlphaBetaPruner.actions(current_state)
+    if not actions:
+        if passed:
+            return 1
+        player, own, opp = current_state
+        return perft_pruner((AlphaBetaPruner.opponent(player), opp, own), depth - 1, True)
+
+    if depth == 1:
+        return len(actions)
+
+    return sum(perft_pruner(AlphaBetaPruner.next_state(current_state, action), depth - 1) for action in actions)
+
+
+def perft_board(board, player, depth, passed=False):
+    """ Returns the number of move sequences of 'depth' moves from the board with 'player' (a colour) to move.
+    """
+    if depth == 0:
+        return 1
+
+    moves = [piece.get_position() for piece in board.get_move_pieces(player)]
+    if not moves:
+        if passed:
+            return 1
+        return perft_board(board, get_opponent(player), depth - 1, True)
+
+    if depth == 1:
+        return len(moves)
+
+    count = 0
+    for move in moves:
+        states = [piece.get_state() for piece in board.pieces]
+        board.make_move(move, player)
+        count += perft_board(board, get_opponent(player), depth - 1)
+        for piece, state in zip(board.pieces, states):
+            if state == WHITE:
+                piece.set_white()
+            elif state == BLACK:
+                piece.set_black()
+            else:
+                piece.set_board()
+    return count
+
+
+def make_board(current_state):
+    """ Returns a Board with the discs of a (current_player, own, opp) state.
+    """
+    player, own, opp = current_state
+    white, black = (own, opp) if player == WHITE_ID else (opp, own)
+    board = Board(False)
+    for tile in bitboard.tiles(white):
+        board.set_white(*bitboard.to_coordinates(tile))
+    for tile in bitboard.tiles(black):
+        board.set_black(*bitboard.to_coordinates(tile))
+    return board
+
+
+def perft(current_state, depth, path='position'):
+    """ Returns the perft count of a (current_player, own, opp) state with the move generator of 'path'.
+    """
+    if path == 'board':
+        return perft_board(make_board(current_state), WHITE if current_state[0] == WHITE_ID else BLACK, depth)
+    if path == 'pruner':
+        return perft_pruner(current_state, depth)
+    return perft_position(Position(current_state), depth)
+
+
+def benchmark(current_state, depth, path):
+    """ Returns a (count, nodes per second) tuple of perft with the move generator of 'path'.
+    """
+    start = time.perf_counter()
+    count = perft(current_state, depth, path)
+    return count, count / max(time.perf_counter() - start, 1e-9)
+
+
+def main():
+    """ Checks the perft counts of the corpus and prints the nodes per second of every move generator.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', help="Number of moves counted from every position.", type=int, default=4)
+    parser.add_argument('--path', help="Move generator to count with, all of them by default.",
+                        choices=PATHS, action='append')
+    args = parser.parse_args()
+
+    failed = False
+    for name, current_state, counts in CORPUS:
+        for path in args.path or PATHS:
+            count, speed = benchmark(current_state, args.depth, path)
+            expected = counts.get(args.depth)
+            status = '' if expected is None else ' ok' if count == expected else ' expected {0}'.format(expected)
+            failed = failed or (expected is not None and count != expected)
+            print('{0:<10} {1:<8} depth {2}: {3:>10} {4:>12.0f} nodes/s{5}'.format(
+                name, path, args.depth, count, speed, status))
+    if failed:
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,128 +1,105 @@
-import sys
 from game.settings import *
 from game import color as clr
 
 
-class Piece(object):
-    """Pieces are laid out on the board on an 8x8 grid."""
+def _glyphs(colour):
+    """ Returns the drawing of a piece for every (state, flipped) pair, in monochrome or 256 RGB colour.
+    """
+    if colour:
+        white = clr.format_color('  ', bg=clr.rgb(5, 5, 5))
+        white_flipped = clr.format_color('><', fg=clr.rgb(4, 4, 4), bg=clr.rgb(5, 5, 5))
+        black = clr.format_color('  ', bg=clr.rgb(1, 1, 1))
+        black_flipped = clr.format_color('><', fg=clr.rgb(2, 2, 2), bg=clr.rgb(1, 1, 1))
+        board = clr.format_color('  ', bg=clr.rgb(0, 3, 0))
+        move = clr.format_color('><', fg=clr.rgb(5, 0, 0), bg=clr.rgb(0, 3, 0))
+    else:
+        white, white_flipped, black, black_flipped, board, move = 'WW', 'WF', 'BB', 'BF', '..', 'MM'
 
-    def __init__(self, x, y, colour):
-        self.x = x
-        self.y = y
-        self.state = 'BOARD'
-        self.flipped = False
-        self.colour = colour
+    return {(WHITE, False): white, (WHITE, True): white_flipped,
+            (BLACK, False): black, (BLACK, True): black_flipped,
+            (BOARD, False): board, (BOARD, True): board,
+            (MOVE, False): move, (MOVE, True): move}
 
-        self.drawing = {
-            "WHITE": self.draw_white,
-            "BLACK": self.draw_black,
-            "BOARD": self.draw_board,
-            "MOVE": self.draw_move}
 
-    def draw(self):
-        """ Returns a string representation of the piece in its current state.
-        """
-        result = ''
-        if self.state in self.drawing:
-            result = self.drawing[self.state]()
+# The drawings are made once, GLYPHS[colour][state, flipped].
+GLYPHS = {False: _glyphs(False), True: _glyphs(True)}
 
-        return result
 
-    def draw_white(self):
-        """ Returns a string representation of a white piece.
-        """
-        if self.flipped:
-            if self.colour:
-                return clr.format_color('><', fg=clr.rgb(4, 4, 4), bg=clr.rgb(5, 5, 5))
+class Piece(object):
+    """Pieces are laid out on the board on an 8x8 grid.
 
-            return 'WF'
-        else:
-            if self.colour:
-                return clr.format_color('  ', bg=clr.rgb(5, 5, 5))
+    A piece is a view of a tile of a Board, which keeps the state of every tile.
+    A piece made without a board gets a board of its own.
+    """
 
-            return 'WW'
+    __slots__ = ('x', 'y', 'bit', 'board')
 
-    def draw_black(self):
-        """ Returns a string representation of a black piece.
-        """
-        if self.flipped:
-            if self.colour:
-                return clr.format_color('><', fg=clr.rgb(2, 2, 2), bg=clr.rgb(1, 1, 1))
-            return 'BF'
-        else:
-            if self.colour:
-                return clr.format_color('  ', bg=clr.rgb(1, 1, 1))
-
-            return 'BB'
-
-    def draw_board(self):
-        """ Returns a string representation of a board piece.
-        """
-        if self.colour:
-            return clr.format_color('  ', bg=clr.rgb(0, 3, 0))
-        else:
-            return '..'
+    def __init__(self, x, y, colour=False, board=None):
+        if board is None:
+            from game.board import Board
+            board = Board(colour)
+        self.x = x
+        self.y = y
+        self.bit = 1 << (x + y * WIDTH)
+        self.board = board
 
-    def draw_move(self):
-        """ Returns a string representation of a move piece.
+    def draw(self):
+        """ Returns a string representation of the piece in its current state.
         """
-        if self.colour:
-            return clr.format_color('><', fg=clr.rgb(5, 0, 0), bg=clr.rgb(0, 3, 0))
-
-        return 'MM'
+        return GLYPHS[self.board.colour][self.get_state(), self.is_flipped()]
 
     def set_black(self):
         """ Sets a piece's state to be BLACK.
         """
-        self.state = 'BLACK'
+        self.board.set_black(self.x, self.y)
 
     def set_white(self):
         """ Sets a piece's state to be WHITE.
         """
-        self.state = 'WHITE'
+        self.board.set_white(self.x, self.y)
 
     def set_move(self):
         """ Sets a piece's state to be MOVE.
         """
-        self.state = MOVE
+        self.board.set_move(self.x, self.y)
 
     def set_board(self):
         """ Sets the piece's state to be BOARD.
         """
-        self.state = BOARD
+        self.board.set_board(self.x, self.y)
 
     def get_state(self):
         """ Returns the piece's current state.
         """
-        return self.state
+        board, bit = self.board, self.bit
+        if board.white & bit:
+            return WHITE
+        if board.black & bit:
+            return BLACK
+        if board.marked & bit:
+            return MOVE
+        return BOARD
 
     def flip(self):
         """ Flips a piece from WHITE<->BLACK and marks it as flipped.
             Otherwise it returns a ValueError. (You can't flip a move/board piece)
         """
-        if self.state == BLACK:
-            self.state = WHITE
-        elif self.state == WHITE:
-            self.state = BLACK
-        else:
-            raise ValueError
-
-        self.flipped = True
+        self.board.flip(self.x, self.y)
 
     def set_flipped(self):
         """ Sets the piece to flipped.
         """
-        self.flipped = True
+        self.board.set_flipped(self.x, self.y)
 
     def reset_flipped(self):
         """ Sets the piece to not be flipped.
         """
-        self.flipped = False
+        self.board.flipped &= ~self.bit
 
     def is_flipped(self):
         """ Returns True if the piece is flipped, otherwise False.
         """
-        return self.flipped
+        return bool(self.board.flipped & self.bit)
 
     def get_position(self):
         """ Returns the piece's coordinates as an (x, y).
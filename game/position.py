@@ -0,0 +1,149 @@
+from game.settings import *
+from game import bitboard
+from game.table import ZOBRIST, ZOBRIST_FLIP, ZOBRIST_SIDE, hash_state
+
+# Every move fills a tile, passes aside, so a game can never be longer than this.
+MAX_PLY = 2 * WIDTH * HEIGHT
+
+CORNER_TILES = tuple((bitboard.CORNERS >> tile) & 1 for tile in range(WIDTH * HEIGHT))
+EDGE_TILES = tuple((bitboard.EDGES >> tile) & 1 for tile in range(WIDTH * HEIGHT))
+
+
+class Position(object):
+    """A mutable position that is searched by making and unmaking moves in place.
+
+    The discs flipped by every move are recorded on an undo stack that is
+    allocated once, so walking the tree does not create a new state per node.
+
+    The evaluation terms are kept as running totals from white's point of view,
+    (white - black), and are updated by every make and unmake.
+    """
+
+    def __init__(self, current_state, key=None):
+        self.player, self.own, self.opp = current_state
+        self.key = hash_state(current_state) if key is None else key
+        self.ply = 0
+        self.empties = WIDTH * HEIGHT - bitboard.count(self.own | self.opp)
+        self.undo_tiles = [0] * MAX_PLY
+        self.undo_flips = [0] * MAX_PLY
+        self.undo_keys = [0] * MAX_PLY
+        self.undo_discs = [0] * MAX_PLY
+        self.undo_corners = [0] * MAX_PLY
+        self.undo_edges = [0] * MAX_PLY
+        self.undo_weights = [0] * MAX_PLY
+        # The pattern indices of the position (see game.patterns), when an evaluator needs them.
+        self.patterns = None
+
+        white, black = (self.own, self.opp) if self.player == WHITE_ID else (self.opp, self.own)
+        self.discs = bitboard.count(white) - bitboard.count(black)
+        self.corners = bitboard.count(white & bitboard.CORNERS) - bitboard.count(black & bitboard.CORNERS)
+        self.edges = bitboard.count(white & bitboard.EDGES) - bitboard.count(black & bitboard.EDGES)
+        self.weights = sum(SQUARE_WEIGHTS[t] for t in bitboard.tiles(white)) - \
+            sum(SQUARE_WEIGHTS[t] for t in bitboard.tiles(black))
+
+    def state(self):
+        """ Returns the position as a "current_state" tuple, (current_player, own, opp).
+        """
+        return self.player, self.own, self.opp
+
+    def actions(self):
+        """ Returns a list of tiles for the valid moves for the current player.
+        """
+        return bitboard.tiles(bitboard.get_moves(self.own, self.opp))
+
+    def make(self, tile):
+        """ Plays the current player's disc on 'tile' and hands the turn to the opponent.
+        """
+        own, opp = self.own, self.opp
+        flips = bitboard.get_flips(own, opp, tile)
+
+        ply = self.ply
+        if self.patterns is not None:
+            self.patterns.make(ply, self.player, tile, flips)
+
+        self.undo_tiles[ply] = tile
+        self.undo_flips[ply] = flips
+        self.undo_keys[ply] = self.key
+        self.undo_discs[ply] = self.discs
+        self.undo_corners[ply] = self.corners
+        self.undo_edges[ply] = self.edges
+        self.undo_weights[ply] = self.weights
+        self.ply = ply + 1
+        self.empties -= 1
+
+        # Corners can never be flipped, so only the played tile can change the corner count.
+        key = self.key ^ ZOBRIST[self.player][tile] ^ ZOBRIST_SIDE
+        discs, edges, weights = 1, EDGE_TILES[tile], SQUARE_WEIGHTS[tile]
+        bits = flips
+        while bits:
+            low = bits & -bits
+            flipped = low.bit_length() - 1
+            key ^= ZOBRIST_FLIP[flipped]
+            discs += 2
+            edges += 2 * EDGE_TILES[flipped]
+            weights += 2 * SQUARE_WEIGHTS[flipped]
+            bits ^= low
+
+        if self.player == WHITE_ID:
+            self.discs += discs
+            self.corners += CORNER_TILES[tile]
+            self.edges += edges
+            self.weights += weights
+            self.player = BLACK_ID
+        else:
+            self.discs -= discs
+            self.corners -= CORNER_TILES[tile]
+            self.edges -= edges
+            self.weights -= weights
+            self.player = WHITE_ID
+
+        self.key = key
+        self.own = opp ^ flips
+        self.opp = own | flips | (1 << tile)
+
+    def make_pass(self):
+        """ Hands the turn to the opponent without playing a disc.
+        """
+        self.key ^= ZOBRIST_SIDE
+        self.player = BLACK_ID if self.player == WHITE_ID else WHITE_ID
+        self.own, self.opp = self.opp, self.own
+
+    def unmake_pass(self):
+        """ Takes back a pass.
+        """
+        self.make_pass()
+
+    def unmake(self):
+        """ Takes back the last move made.
+        """
+        ply = self.ply - 1
+        self.ply = ply
+        if self.patterns is not None:
+            self.patterns.unmake(ply)
+        self.empties += 1
+        flips = self.undo_flips[ply]
+
+        self.key = self.undo_keys[ply]
+        self.discs = self.undo_discs[ply]
+        self.corners = self.undo_corners[ply]
+        self.edges = self.undo_edges[ply]
+        self.weights = self.undo_weights[ply]
+        self.player = BLACK_ID if self.player == WHITE_ID else WHITE_ID
+        self.own, self.opp = self.opp ^ flips ^ (1 << self.undo_tiles[ply]), self.own ^ flips
+
+    def evaluation(self, player_to_check):
+        """ Returns a positive value when the player wins.
+            Returns zero when there is a draw.
+            Returns a negative value when the opponent wins.
+        """
+        sign = 1 if player_to_check == WHITE_ID else -1
+
+        # count_eval stands for the player with the most pieces next turn
+        discs = sign * self.discs
+        count_eval = 1 if discs > 0 else 0 if discs == 0 else -1
+
+        corners_eval = sign * self.corners
+        edges_eval = sign * self.edges / (WIDTH * HEIGHT)
+        positional_eval = sign * self.weights / SQUARE_WEIGHTS[0]
+
+        return count_eval * 2 + corners_eval * 1.5 + edges_eval * 1.2 + positional_eval
@@ -0,0 +1,61 @@
+"""
+Terminal renderer that only repaints the tiles that changed.
+
+The glyph of every (state, flipped) pair is drawn once (GLYPHS in game/piece.py),
+and every frame moves the cursor to the tiles whose glyph changed with ANSI
+escape codes instead of clearing the screen and printing the whole board again.
+"""
+import sys
+from game.piece import GLYPHS
+from game.settings import *
+
+CLEAR_SCREEN = '\x1b[2J\x1b[H'
+CLEAR_BELOW = '\x1b[J'
+LABELS = '  a.b.c.d.e.f.g.h.'
+
+# The board takes the first lines of the screen, the labels, the rows and the labels again.
+BOARD_LINES = HEIGHT + 2
+
+
+def move_cursor(line, column):
+    """ Returns the escape code moving the cursor to a line and column, counted from 1.
+    """
+    return '\x1b[{0};{1}H'.format(line, column)
+
+
+class Renderer(object):
+    """Draws the board at the top of the terminal and the game information below it."""
+
+    def __init__(self, colour, out=sys.stdout):
+        self.glyphs = GLYPHS[colour]
+        self.move_glyph = self.glyphs[MOVE, False]
+        self.out = out
+        self.cells = None
+
+    def draw(self, board, moves, info):
+        """ Draws the pieces of the board, with 'moves' (a list of (x, y) tuples) marked, followed by
+            the lines of 'info'. Only the tiles that changed since the last call are written.
+        """
+        glyphs = self.glyphs
+        cells = [glyphs[piece.get_state(), piece.is_flipped()] for piece in board.pieces]
+        for x, y in moves:
+            cells[x + y * WIDTH] = self.move_glyph
+
+        if self.cells is None:
+            rows = ['{0} {1}{0}'.format(y + 1, ''.join(cells[y * WIDTH:(y + 1) * WIDTH])) for y in range(HEIGHT)]
+            output = [CLEAR_SCREEN, LABELS, '\n', '\n'.join(rows), '\n', LABELS]
+        else:
+            output = [move_cursor(tile // WIDTH + 2, 3 + 2 * (tile % WIDTH)) + cell
+                      for tile, (cell, last) in enumerate(zip(cells, self.cells)) if cell != last]
+
+        output.append(move_cursor(BOARD_LINES + 1, 1) + CLEAR_BELOW)
+        output.append('\n'.join(info))
+        output.append('\n')
+        self.out.write(''.join(output))
+        self.out.flush()
+        self.cells = cells
+
+    def reset(self):
+        """ Draws the whole screen again on the next call to draw.
+        """
+        self.cells = None
@@ -10,6 +10,8 @@ WEST = - 1
 NORTHWEST = -HEIGHT - 1
 
 DIRECTIONS = (NORTH, NORTHEAST, EAST, SOUTHEAST, SOUTH, SOUTHWEST, WEST, NORTHWEST)
+STEPS = {NORTH: (0, -1), NORTHEAST: (1, -1), EAST: (1, 0), SOUTHEAST: (1, 1),
+         SOUTH: (0, 1), SOUTHWEST: (-1, 1), WEST: (-1, 0), NORTHWEST: (-1, -1)}
 
 BOARD_ID = 0
 MOVE_ID = 1
@@ -18,6 +20,18 @@ BLACK_ID = 3
 
 STOP_MESSAGE = -1
 
+# Positional value of owning each tile, corners are good and the tiles next to them are bad.
+SQUARE_WEIGHTS = (
+    100, -20, 10,  5,  5, 10, -20, 100,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+     10,  -2, -1, -1, -1, -1,  -2,  10,
+      5,  -2, -1, -1, -1, -1,  -2,   5,
+      5,  -2, -1, -1, -1, -1,  -2,   5,
+     10,  -2, -1, -1, -1, -1,  -2,  10,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+    100, -20, 10,  5,  5, 10, -20, 100,
+)
+
 
 def chunks(l, n):
     """ Yield successive n-sized chunks from l.
@@ -39,14 +53,31 @@ class NoMovesError(Exception):
     pass
 
 
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchAborted(Exception):
+    pass
+
+
+def make_ray(tile, direction):
+    """ Returns a tuple of the tiles met when walking from 'tile' in 'direction' up to the edge.
+    """
+    dx, dy = STEPS[direction]
+    x, y = tile % WIDTH + dx, tile // WIDTH + dy
+    ray = []
+    while 0 <= x < WIDTH and 0 <= y < HEIGHT:
+        ray.append(x + (y * WIDTH))
+        x, y = x + dx, y + dy
+    return tuple(ray)
+
+
+# RAYS[tile][direction] lists the tiles from 'tile' to the edge of the board in 'direction'.
+RAYS = tuple({d: make_ray(tile, d) for d in DIRECTIONS} for tile in range(WIDTH * HEIGHT))
+
+
 def outside_board(tile, direction):
-    tile_top = 0 <= tile <= (WIDTH - 1)
-    tile_bot = (WIDTH - 1) * WIDTH <= tile <= WIDTH**2 - 1
-    tile_right = tile % WIDTH == (WIDTH - 1)
-    tile_left = tile % WIDTH == 0
-    if (direction in (NORTH, NORTHEAST, NORTHWEST) and tile_top) or \
-            (direction in (SOUTH, SOUTHWEST, SOUTHEAST) and tile_bot) or \
-            (direction in (NORTHEAST, EAST, SOUTHEAST) and tile_right) or \
-            (direction in (NORTHWEST, WEST, SOUTHWEST) and tile_left):
-        return True
-    return False
+    """ Returns True if the step from 'tile' in 'direction' leaves the board.
+    """
+    return not RAYS[tile][direction]
@@ -0,0 +1,115 @@
+"""
+Statistics of the search of a move, collected when a SearchStats is handed to the pruner.
+"""
+import json
+import time
+
+
+class SearchStats(object):
+    """Counters of the search of a single move.
+
+    The load of the workers is kept per rank, MPI ranks or the process ids of a process pool.
+
+    The pruner always counts its nodes and cutoffs, this only collects them per
+    completed depth and per worker, so a search without stats does no extra work.
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.seconds = 0.0
+        self.move = None
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self.depth = 0
+        self.plies = []
+        self.ranks = {}
+        self.table = {'hits': 0, 'misses': 0, 'collisions': 0}
+
+    def add_ply(self, depth, nodes, cutoffs, first_cutoffs):
+        """ Records the totals of the search up to and including a completed 'depth',
+            every ply keeps the nodes and seconds of the search of its own depth.
+        """
+        now = time.time()
+        last = self.start + sum(ply['seconds'] for ply in self.plies)
+        self.plies.append({'depth': depth, 'nodes': nodes - self.nodes, 'seconds': now - last})
+        self.depth = depth
+        self.nodes, self.cutoffs, self.first_cutoffs = nodes, cutoffs, first_cutoffs
+
+    def add_task(self, rank, nodes):
+        """ Records a subtree searched by a worker, rank 0 is the process running the search.
+        """
+        load = self.ranks.setdefault(rank, {'tasks': 0, 'nodes': 0})
+        load['tasks'] += 1
+        load['nodes'] += nodes
+
+    def add_table(self, before, after):
+        """ Records the probes of the transposition table of the process running the search,
+            from its counters (see TranspositionTable.stats) before and after the search.
+        """
+        self.table = {name: after[name] - before[name] for name in after}
+
+    def hit_rate(self):
+        """ Returns the share of the probes of the transposition table that found their position.
+        """
+        probes = self.table['hits'] + self.table['misses']
+        return self.table['hits'] / probes if probes else 0.0
+
+    def finish(self, move, nodes, cutoffs, first_cutoffs):
+        """ Records the totals once the move, an (x, y) tuple, has been found. When subtrees were
+            handed out, the nodes the workers did not search are the load of rank 0.
+        """
+        self.seconds = time.time() - self.start
+        self.move = move
+        self.nodes, self.cutoffs, self.first_cutoffs = nodes, cutoffs, first_cutoffs
+        if self.ranks:
+            workers = sum(load['nodes'] for rank, load in self.ranks.items() if rank != 0)
+            self.ranks[0] = {'tasks': 1, 'nodes': nodes - workers}
+
+    def branching_factor(self):
+        """ Returns the effective branching factor, the growth of the nodes from one depth to the next,
+            or the depth-th root of the nodes when only one depth was searched.
+        """
+        if len(self.plies) > 1 and self.plies[-2]['nodes']:
+            return self.plies[-1]['nodes'] / self.plies[-2]['nodes']
+        if self.depth > 0 and self.nodes > 0:
+            return self.nodes ** (1.0 / self.depth)
+        return 0.0
+
+    def as_dict(self):
+        """ Returns the statistics as a dict of plain values.
+        """
+        return {
+            'move': None if self.move is None else '{0}{1}'.format(chr(ord('a') + self.move[0]), self.move[1] + 1),
+            'seconds': self.seconds,
+            'nodes': self.nodes,
+            'nodes_per_second': self.nodes / self.seconds if self.seconds else 0.0,
+            'cutoffs': self.cutoffs,
+            'first_cutoffs': self.first_cutoffs,
+            'depth': self.depth,
+            'branching_factor': self.branching_factor(),
+            'plies': self.plies,
+            'ranks': {str(rank): load for rank, load in sorted(self.ranks.items())},
+            'table': self.table,
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+    def report(self):
+        """ Returns the statistics as a few lines of text.
+        """
+        lines = ['Searched {0} nodes in {1:.2f}s ({2:.0f} nodes/s), depth {3}, branching factor {4:.2f}'.format(
+                     self.nodes, self.seconds, self.nodes / self.seconds if self.seconds else 0.0,
+                     self.depth, self.branching_factor()),
+                 'Cutoffs: {0}, {1:.0%} on the first move'.format(
+                     self.cutoffs, self.first_cutoffs / self.cutoffs if self.cutoffs else 0.0),
+                 'Table: {0} hits, {1} misses, {2} collisions, {3:.0%} hit rate'.format(
+                     self.table['hits'], self.table['misses'], self.table['collisions'], self.hit_rate())]
+        if self.plies:
+            lines.append('Plies: ' + ', '.join('{0}: {1:.2f}s'.format(ply['depth'], ply['seconds'])
+                                                for ply in self.plies))
+        if self.ranks:
+            lines.append('Load: ' + ', '.join('rank {0} {1} tasks {2} nodes'.format(rank, load['tasks'], load['nodes'])
+                                               for rank, load in sorted(self.ranks.items())))
+        return '\n'.join(lines)
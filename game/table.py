@@ -0,0 +1,96 @@
+import random
+from game.settings import *
+
+# The keys are seeded so that every process (and every MPI rank) hashes
+# a position to the same value.
+_random = random.Random(0x5EED)
+
+ZOBRIST = {
+    WHITE_ID: [_random.getrandbits(64) for _ in range(WIDTH * HEIGHT)],
+    BLACK_ID: [_random.getrandbits(64) for _ in range(WIDTH * HEIGHT)],
+}
+ZOBRIST_FLIP = [w ^ b for w, b in zip(ZOBRIST[WHITE_ID], ZOBRIST[BLACK_ID])]
+ZOBRIST_SIDE = _random.getrandbits(64)
+
+EXACT, LOWER, UPPER = 0, 1, 2
+DEFAULT_TABLE_SIZE = 1 << 20
+
+
+def hash_state(current_state):
+    """ Returns the Zobrist key of a (current_player, own, opp) state.
+    """
+    player, own, opp = current_state
+    opponent = BLACK_ID if player == WHITE_ID else WHITE_ID
+    key = ZOBRIST_SIDE if player == BLACK_ID else 0
+    for bits, keys in ((own, ZOBRIST[player]), (opp, ZOBRIST[opponent])):
+        while bits:
+            low = bits & -bits
+            key ^= keys[low.bit_length() - 1]
+            bits ^= low
+    return key
+
+
+class TranspositionTable(object):
+    """Fixed size hash table of searched positions.
+
+    Every bucket has two slots, a depth-preferred slot which only gives way to
+    an equal or deeper search of a position, and an always-replace slot which
+    takes everything else. Entries are (key, depth, flag, score, move) tuples,
+    where flag tells whether the score is EXACT, a LOWER bound or an UPPER bound.
+    """
+
+    def __init__(self, size=DEFAULT_TABLE_SIZE):
+        buckets = 1
+        while buckets * 4 <= size:
+            buckets *= 2
+        self.mask = buckets - 1
+        self.deep = [None] * buckets
+        self.recent = [None] * buckets
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key):
+        """ Returns the entry stored for the key, or None.
+        """
+        index = key & self.mask
+        entry = self.deep[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        other = self.recent[index]
+        if other is not None and other[0] == key:
+            self.hits += 1
+            return other
+
+        self.misses += 1
+        if entry is not None or other is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        """ Stores the result of a search of 'depth' plies below the position.
+        """
+        index = key & self.mask
+        entry = self.deep[index]
+        if entry is None or entry[0] == key or depth >= entry[1]:
+            self.deep[index] = (key, depth, flag, score, move)
+        else:
+            self.recent[index] = (key, depth, flag, score, move)
+
+    def clear(self):
+        """ Removes all entries and resets the counters.
+        """
+        self.deep = [None] * len(self.deep)
+        self.recent = [None] * len(self.recent)
+        self.hits = self.misses = self.collisions = 0
+
+    def size(self):
+        """ Returns the maximum number of entries.
+        """
+        return 2 * len(self.deep)
+
+    def stats(self):
+        """ Returns the hit, miss and collision counters as a dict.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'collisions': self.collisions}
@@ -0,0 +1,252 @@
+"""
+Headless self-play between engine settings.
+
+Games are played on a process pool without drawing the board. Every game
+starts with a few random moves, and every random opening is played twice
+with the colours swapped, so neither engine profits from a lucky opening.
+
+A game is written as one tab separated line:
+    black engine, white engine, black discs, white discs, black nodes, white nodes, moves
+where the moves (ex: f5d6c3) leave out the passes, like the self-play records of game.book.
+The output is read as is by game.book --games, with --skip to leave out the random moves.
+"""
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+from game import bitboard
+from game.ai import AlphaBetaPruner
+from game.book import start_state
+from game.endgame import DEFAULT_ENDGAME_EMPTIES
+from game.evaluation import DEFAULT_EVALUATOR, make_evaluator
+from game.position import Position
+from game.settings import *
+from game.table import TranspositionTable
+
+DEFAULT_TOURNAMENT_TABLE_SIZE = 1 << 16
+
+
+class Engine(object):
+    """Search settings of a player, parsed from a spec such as 'depth=4,endgame=10'.
+
+    Keys: depth, movetime (seconds), endgame (empty tiles solved exactly), table (size),
+    eval (evaluator, see game.evaluation) and weights (weight file of the table evaluator, or
+    pattern file of the pattern evaluator).
+    """
+
+    def __init__(self, spec):
+        self.name = spec
+        self.max_depth = 3
+        self.movetime = None
+        self.endgame_empties = DEFAULT_ENDGAME_EMPTIES
+        self.table_size = DEFAULT_TOURNAMENT_TABLE_SIZE
+        evaluation, weights = DEFAULT_EVALUATOR, None
+
+        for item in spec.split(','):
+            key, _, value = item.partition('=')
+            if key == 'depth':
+                self.max_depth = int(value)
+            elif key == 'movetime':
+                self.movetime = float(value)
+            elif key == 'endgame':
+                self.endgame_empties = int(value)
+            elif key == 'table':
+                self.table_size = int(value)
+            elif key == 'eval':
+                evaluation = value
+            elif key == 'weights':
+                weights = value
+            else:
+                raise ValueError('Unknown engine setting {0} in {1}'.format(key, spec))
+
+        self.evaluator = make_evaluator(evaluation, weights)
+
+    def next_move(self, current_state, table):
+        """ Returns a (tile, nodes) tuple of the move the engine plays in the state.
+        """
+        player = current_state[0]
+        pruner = AlphaBetaPruner(None, self.max_depth, None, WHITE if player == WHITE_ID else BLACK, table,
+                                 self.movetime, state=current_state, endgame_empties=self.endgame_empties,
+                                 evaluator=self.evaluator)
+        return bitboard.to_tile(pruner.run()), pruner.nodes
+
+    def __repr__(self):
+        return self.name
+
+
+# The transposition tables of the engines in a pool worker, allocated once per process.
+_tables = {}
+
+
+def engine_table(engine):
+    """ Returns the cleared transposition table of the engine in this process.
+    """
+    table = _tables.get(engine.name)
+    if table is None:
+        table = _tables[engine.name] = TranspositionTable(engine.table_size)
+    else:
+        table.clear()
+    return table
+
+
+def format_move(tile):
+    """ Returns the move on the tile as text, ex: f5.
+    """
+    x, y = bitboard.to_coordinates(tile)
+    return chr(ord('a') + x) + str(y + 1)
+
+
+def play_game(black, white, seed, plies):
+    """ Plays a game from 'plies' random moves picked with 'seed'.
+        Returns a (black discs, white discs, black nodes, white nodes, moves) tuple.
+    """
+    r = random.Random(seed)
+    position = Position(start_state())
+    engines = {BLACK_ID: black, WHITE_ID: white}
+    tables = {BLACK_ID: engine_table(black), WHITE_ID: engine_table(white)}
+    nodes = {BLACK_ID: 0, WHITE_ID: 0}
+    moves = []
+
+    while True:
+        actions = position.actions()
+        if not actions:
+            position.make_pass()
+            if not position.actions():
+                break
+            continue
+
+        player = position.player
+        if len(moves) < plies:
+            tile = r.choice(actions)
+        else:
+            tile, searched = engines[player].next_move(position.state(), tables[player])
+            nodes[player] += searched
+        moves.append(tile)
+        position.make(tile)
+
+    black_discs, white_discs = (position.own, position.opp) if position.player == BLACK_ID \
+        else (position.opp, position.own)
+    return bitboard.count(black_discs), bitboard.count(white_discs), nodes[BLACK_ID], nodes[WHITE_ID], \
+        ''.join(format_move(tile) for tile in moves)
+
+
+def play_task(task):
+    """ Plays a (black, white, seed, plies) task and returns (black, white) followed by the result of play_game.
+    """
+    black, white, seed, plies = task
+    return (black, white) + play_game(black, white, seed, plies)
+
+
+def schedule(engines, games, plies, seed):
+    """ Returns the (black, white, seed, plies) tasks of the tournament. Every pair of engines plays
+        the same number of games, and every random opening is played with both colours.
+    """
+    pairs = [(a, b) for i, a in enumerate(engines) for b in engines[i + 1:]]
+    r = random.Random(seed)
+    tasks = []
+    while len(tasks) < games:
+        for a, b in pairs:
+            opening = r.getrandbits(32)
+            tasks.append((a, b, opening, plies))
+            tasks.append((b, a, opening, plies))
+    return tasks[:games]
+
+
+class Summary(object):
+    """Running totals of the tournament results per engine."""
+
+    def __init__(self, engines):
+        self.start = time.time()
+        self.games = 0
+        self.nodes = 0
+        self.results = {engine.name: {'wins': 0, 'draws': 0, 'losses': 0} for engine in engines}
+
+    def add(self, black, white, black_discs, white_discs, black_nodes, white_nodes):
+        self.games += 1
+        self.nodes += black_nodes + white_nodes
+        if black_discs == white_discs:
+            self.results[black.name]['draws'] += 1
+            self.results[white.name]['draws'] += 1
+        else:
+            winner, loser = (black, white) if black_discs > white_discs else (white, black)
+            self.results[winner.name]['wins'] += 1
+            self.results[loser.name]['losses'] += 1
+
+    def win_rate(self, name):
+        """ Returns the share of points of the engine, a draw counts as half a win.
+        """
+        result = self.results[name]
+        played = result['wins'] + result['draws'] + result['losses']
+        return (result['wins'] + result['draws'] / 2) / played if played else 0.0
+
+    def report(self):
+        """ Returns the summary as text.
+        """
+        elapsed = max(time.time() - self.start, 1e-9)
+        lines = []
+        for name, result in self.results.items():
+            lines.append('{0:<24} +{1} ={2} -{3}  {4:.1%}'.format(
+                name, result['wins'], result['draws'], result['losses'], self.win_rate(name)))
+        lines.append('{0} games in {1:.1f}s, {2:.2f} games/s, {3:.0f} nodes/s'.format(
+            self.games, elapsed, self.games / elapsed, self.nodes / elapsed))
+        return '\n'.join(lines)
+
+
+def run_tournament(engines, games, workers=1, plies=4, seed=0, output=None):
+    """ Plays the games on 'workers' processes, writes every result line to 'output'
+        (a file object) as the games finish, and returns the Summary.
+    """
+    summary = Summary(engines)
+    tasks = schedule(engines, games, plies, seed)
+
+    if workers > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(workers)
+        results = executor.map(play_task, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+    else:
+        executor = None
+        results = map(play_task, tasks)
+
+    try:
+        for black, white, black_discs, white_discs, black_nodes, white_nodes, moves in results:
+            summary.add(black, white, black_discs, white_discs, black_nodes, white_nodes)
+            if output is not None:
+                output.write('{0}\t{1}\t{2}\t{3}\t{4}\t{5}\t{6}\n'.format(
+                    black, white, black_discs, white_discs, black_nodes, white_nodes, moves))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return summary
+
+
+def main():
+    """ Runs a self-play tournament and prints its summary.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('engines', nargs='+',
+                        help="Settings of an engine, ex: depth=4,endgame=10 (keys: depth, movetime, endgame, table, "
+                             "eval, weights). "
+                             "With a single engine it plays itself.")
+    parser.add_argument('--games', help="Number of games to play.", type=int, default=100)
+    parser.add_argument('--workers', help="Number of processes playing games.", type=int, default=os.cpu_count())
+    parser.add_argument('--plies', help="Number of random moves at the start of every game.", type=int, default=4)
+    parser.add_argument('--seed', help="Seed of the random openings.", type=int, default=0)
+    parser.add_argument('--output', help="File the result of every game is written to.")
+    args = parser.parse_args()
+
+    engines = [Engine(spec) for spec in args.engines]
+    if len(engines) == 1:
+        engines.append(Engine(args.engines[0]))
+        engines[1].name += ' (2)'
+
+    output = open(args.output, 'w') if args.output else None
+    try:
+        summary = run_tournament(engines, args.games, args.workers, args.plies, args.seed, output)
+    finally:
+        if output is not None:
+            output.close()
+    print(summary.report())
+
+
+if __name__ == '__main__':
+    main()
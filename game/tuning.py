@@ -0,0 +1,238 @@
+"""
+Fits the weights of the table evaluation (see game.evaluation) to the results of self-play games.
+
+The games are read from self-play records, either the output of game.tournament or
+lines of moves (ex: f5d6c3) like the records of game.book. Every game is replayed,
+and every position reached after the opening plies is stored with the final disc
+difference for the player to move, scored like the exact results of the search.
+The positions are kept in fixed size batches of bitboards, and the features of a
+whole batch are extracted at once with NumPy: the disc difference on each of the
+10 square classes and the mobility difference.
+Only the small integer features are kept, 11 bytes per position.
+
+The weights of every phase are then fitted to the positions of that phase, by
+least squares on the disc difference, or by logistic regression on the result
+(win, draw or loss). The fitted weights are written to a weight file which the
+engine loads with --weights.
+
+    python -m game.tuning games.tsv --output weights.json --method logistic
+
+Requires NumPy.
+"""
+import argparse
+import numpy as np
+from game import bitboard
+from game.book import start_state
+from game.endgame import DISC_SCORE, EndgameSolver
+from game.evaluation import DEFAULT_WEIGHTS, CLASS_SQUARES, SQUARE_CLASSES, load_weights, write_weights, \
+    symmetric_squares
+from game.position import Position
+from game.settings import *
+
+METHODS = ('least-squares', 'logistic')
+DEFAULT_BATCH = 1 << 16
+FEATURES = len(CLASS_SQUARES) + 1
+
+# CLASS_MATRIX[tile][c] is 1 when the tile is in square class c.
+CLASS_MATRIX = np.array([[SQUARE_CLASSES[tile] == square for square in CLASS_SQUARES]
+                         for tile in range(WIDTH * HEIGHT)], dtype=np.int16)
+
+# The logistic model predicts a win with sigmoid(score / LOGISTIC_SCALE), a score of
+# 4 discs gives a 73% chance to win.
+LOGISTIC_SCALE = 4 * DISC_SCORE
+NEWTON_STEPS = 20
+
+
+def read_games(paths):
+    """ Yields the moves of every game in the files, one string per game. A line of the
+        tournament output has the moves in its last column.
+    """
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                moves = line.rstrip('\n').split('\t')[-1].strip()
+                if moves:
+                    yield moves
+
+
+def replay(moves, skip=0):
+    """ Returns a list of (own, opp, empties) tuples of the positions of a game after the first 'skip'
+        moves, and the final disc difference for the player to move in each of them, with the empty
+        tiles counted for the winner like the exact scores of the search (see EndgameSolver.final_score).
+        Returns None for the positions of an illegal record.
+    """
+    position = Position(start_state())
+    positions = []
+    players = []
+
+    for i in range(0, len(moves), 2):
+        tile = bitboard.to_tile((ord(moves[i]) - ord('a'), ord(moves[i + 1]) - ord('1')))
+        if not position.actions():
+            position.make_pass()
+        if tile not in position.actions():
+            return None, []
+        if i // 2 >= skip:
+            positions.append((position.own, position.opp, position.empties))
+            players.append(position.player)
+        position.make(tile)
+
+    discs = EndgameSolver.final_score(position.own, position.opp)
+    return positions, [discs if player == position.player else -discs for player in players]
+
+
+def popcount(bits):
+    """ Returns the number of set bits of every element of an array of uint64.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bits).astype(np.int16)
+    return np.unpackbits(bits.astype('<u8').view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1, dtype=np.int16)
+
+
+def features(own, opp):
+    """ Returns the (n, FEATURES) int8 array of the features of arrays of own and opp bitboards:
+        the disc difference on every square class, then the mobility difference.
+    """
+    own, opp = own.astype('<u8'), opp.astype('<u8')
+    own_bits = np.unpackbits(own.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    opp_bits = np.unpackbits(opp.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+
+    result = np.empty((len(own), FEATURES), dtype=np.int8)
+    result[:, :-1] = (own_bits.astype(np.int16) - opp_bits) @ CLASS_MATRIX
+    result[:, -1] = popcount(bitboard.get_moves(own, opp)) - popcount(bitboard.get_moves(opp, own))
+    return result
+
+
+class Dataset(object):
+    """Features, empty tile counts and results of positions, filled in batches."""
+
+    def __init__(self, batch=DEFAULT_BATCH):
+        self.batch = batch
+        self.own = np.empty(batch, dtype=np.uint64)
+        self.opp = np.empty(batch, dtype=np.uint64)
+        self.pending_empties = np.empty(batch, dtype=np.uint8)
+        self.pending_results = np.empty(batch, dtype=np.int8)
+        self.pending = 0
+        self.chunks = []
+
+    def add(self, own, opp, empties, result):
+        self.own[self.pending] = own
+        self.opp[self.pending] = opp
+        self.pending_empties[self.pending] = empties
+        self.pending_results[self.pending] = result
+        self.pending += 1
+        if self.pending == self.batch:
+            self.flush()
+
+    def flush(self):
+        """ Extracts the features of the pending positions.
+        """
+        n = self.pending
+        if n:
+            self.chunks.append((features(self.own[:n], self.opp[:n]), self.pending_empties[:n].copy(),
+                                self.pending_results[:n].copy()))
+        self.pending = 0
+
+    def arrays(self):
+        """ Returns the (features, empties, results) arrays of all the positions.
+        """
+        self.flush()
+        if not self.chunks:
+            return np.empty((0, FEATURES), dtype=np.int8), np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.int8)
+        x, empties, results = zip(*self.chunks)
+        self.chunks = []
+        return np.concatenate(x), np.concatenate(empties), np.concatenate(results)
+
+
+def load_dataset(games, skip=0, batch=DEFAULT_BATCH):
+    """ Returns the (features, empties, results) arrays of the positions of the games, see replay.
+    """
+    dataset = Dataset(batch)
+    for moves in games:
+        positions, results = replay(moves, skip)
+        if positions is None:
+            continue
+        for (own, opp, empties), result in zip(positions, results):
+            dataset.add(own, opp, empties, result)
+    return dataset.arrays()
+
+
+def fit_least_squares(x, results, ridge=1.0, batch=DEFAULT_BATCH):
+    """ Returns the weights minimising the squared error to the disc differences, in DISC_SCORE units.
+        The normal equations are summed batch by batch.
+    """
+    xtx = np.zeros((FEATURES, FEATURES))
+    xty = np.zeros(FEATURES)
+    for start in range(0, len(x), batch):
+        chunk = x[start:start + batch].astype(np.float64)
+        xtx += chunk.T @ chunk
+        xty += chunk.T @ (results[start:start + batch].astype(np.float64) * DISC_SCORE)
+    return np.linalg.solve(xtx + ridge * np.eye(FEATURES), xty)
+
+
+def fit_logistic(x, results, ridge=1.0, batch=DEFAULT_BATCH):
+    """ Returns the weights of the logistic regression of the results (1 for a win, 0.5 for a draw
+        and 0 for a loss) fitted with Newton's method, in DISC_SCORE units.
+    """
+    outcomes = (np.sign(results).astype(np.float64) + 1) / 2
+    w = np.zeros(FEATURES)
+    for _ in range(NEWTON_STEPS):
+        gradient = -ridge * w
+        hessian = -ridge * np.eye(FEATURES)
+        for start in range(0, len(x), batch):
+            chunk = x[start:start + batch].astype(np.float64)
+            p = 1 / (1 + np.exp(-(chunk @ w)))
+            gradient += chunk.T @ (outcomes[start:start + batch] - p)
+            hessian -= (chunk * (p * (1 - p))[:, None]).T @ chunk
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.abs(step).max() < 1e-6:
+            break
+    return w * LOGISTIC_SCALE
+
+
+def tune(x, empties, results, base=None, method='least-squares', ridge=1.0, batch=DEFAULT_BATCH):
+    """ Returns the weights fitted to every phase of the base weights, and the number of positions
+        of every phase. A phase with too few positions keeps its base weights.
+    """
+    base = base if base is not None else DEFAULT_WEIGHTS
+    fit = fit_logistic if method == 'logistic' else fit_least_squares
+    phases, counts = [], []
+
+    for phase in base['phases']:
+        low, high = phase['empties']
+        selected = (empties >= low) & (empties <= high)
+        counts.append(int(selected.sum()))
+        if counts[-1] < 10 * FEATURES:
+            phases.append(dict(phase))
+            continue
+        w = fit(x[selected], results[selected], ridge, batch)
+        phases.append({'empties': [low, high], 'mobility': int(round(w[-1])),
+                       'squares': symmetric_squares([int(round(weight)) for weight in w[:-1]])})
+    return {'phases': phases}, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fits the weights of the table evaluation to self-play games.")
+    parser.add_argument('games', nargs='+', help="Self-play records, tournament output or lines of moves.")
+    parser.add_argument('--output', help="Weight file to write.", required=True)
+    parser.add_argument('--method', help="Fit the disc difference (least-squares) or the result (logistic).",
+                        choices=METHODS, default='least-squares')
+    parser.add_argument('--base', help="Weight file whose phases are fitted, the default weights when left out.")
+    parser.add_argument('--skip', help="Number of opening moves of every game left out, such as the random "
+                                       "moves of a tournament.", type=int, default=4)
+    parser.add_argument('--ridge', help="Penalty on the size of the weights.", type=float, default=1.0)
+    parser.add_argument('--batch', help="Number of positions whose features are extracted at once.",
+                        type=int, default=DEFAULT_BATCH)
+    args = parser.parse_args()
+
+    x, empties, results = load_dataset(read_games(args.games), args.skip, args.batch)
+    weights, counts = tune(x, empties, results, load_weights(args.base) if args.base else None, args.method,
+                           args.ridge, args.batch)
+    write_weights(args.output, weights)
+
+    for phase, count in zip(weights['phases'], counts):
+        print('{0[0]}-{0[1]} empties: {1} positions'.format(phase['empties'], count))
+
+
+if __name__ == '__main__':
+    main()
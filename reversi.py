@@ -1,28 +1,66 @@
 #!/usr/bin/env python3
 
 import argparse
-from mpi4py import MPI
 from game.game import Game
 from datetime import datetime
-from game.ai import AlphaBetaPruner
+from game.backend import BACKENDS, select_backend
+from game.book import Book
+from game.endgame import DEFAULT_ENDGAME_EMPTIES
+from game.evaluation import EVALUATORS, DEFAULT_EVALUATOR, make_evaluator
+from game.table import DEFAULT_TABLE_SIZE
+from game.settings import WIDTH, HEIGHT
 
-COMM = MPI.COMM_WORLD
-RANK = COMM.Get_rank()
 
-
-def main():
-    """ Reversi game with human player vs AI player.
+def parse_args():
+    """ Returns the parsed command line options.
     """
-
     parser = argparse.ArgumentParser()
     parser.add_argument('--depth', help="Max depth the tree is allowed to think before making its move.",
-                        type=int, default=5)
+                        type=int, default=None)
+    parser.add_argument('--movetime', help="Seconds the ai may think about a move, searching deeper until the time "
+                                           "is up. Also bounded by --depth when given.", type=float, default=None)
     parser.add_argument('--display-moves', help="Whether legal moves should be displayed or not.", action='store_true')
+    parser.add_argument('--headless', help="Do not draw the board, only the result of the game is shown.",
+                        action='store_true')
     parser.add_argument('--colour', help="Display the game in 256 colours.", action='store_true')
     parser.add_argument('--player', help="If you want to play against the ai", action='store_true')
     parser.add_argument('--ai', help="If you want the ais to play against each other", action='store_true')
+    parser.add_argument('--table-size', help="Max number of positions kept in the transposition table.",
+                        type=int, default=DEFAULT_TABLE_SIZE)
+    parser.add_argument('--ponder', help="Let the ai think about its reply while the player is thinking.",
+                        action='store_true')
+    parser.add_argument('--book', help="Opening book file to take the ai's first moves from, "
+                                       "see python -m game.book --help to build one.")
+    parser.add_argument('--endgame-empties', help="Number of empty tiles from which the ai searches to the end of "
+                                                  "the game for the exact result, 0 to turn it off.",
+                        type=int, default=DEFAULT_ENDGAME_EMPTIES)
+    parser.add_argument('--evaluation', help="How the ai scores the positions at the end of its search: the weights "
+                                             "of a table per phase of the game (table), the fixed disc, corner, "
+                                             "edge and positional terms (terms) or tables of the configurations of "
+                                             "the edges, corners and diagonals (pattern).",
+                        choices=EVALUATORS, default=DEFAULT_EVALUATOR)
+    parser.add_argument('--weights', help="Weight file of the table evaluation, see python -m game.evaluation --help "
+                                          "to write one, or pattern file of the pattern evaluation, see "
+                                          "python -m game.patterns --help.")
+    parser.add_argument('--stats', help="Show the statistics of the search of every ai move.", action='store_true')
+    parser.add_argument('--stats-file', help="File the statistics of every ai move are written to, "
+                                             "one JSON object per line.")
+    parser.add_argument('--workers', help="Number of processes searching in parallel, without MPI.",
+                        type=int, default=1)
+    parser.add_argument('--backend', help="Where the young brothers are searched: in this process (serial), on "
+                                          "--workers processes (pool) or on the MPI ranks (mpi). auto picks mpi "
+                                          "when started by mpirun, pool with more than one worker and otherwise "
+                                          "serial.", choices=BACKENDS, default='auto')
+
+    return parser.parse_args()
+
+
+def main(args, backend, evaluator):
+    """ Reversi game with human player vs AI player.
+    """
 
-    args = parser.parse_args()
+    if args.depth is None:
+        args.depth = 5 if args.movetime is None else WIDTH * HEIGHT
 
     if args.depth < 0:
         exit()
@@ -35,34 +73,46 @@ def main():
     if not players:
         players = ['player', 'ai']
 
+    stats_file = open(args.stats_file, 'w') if args.stats_file else None
+
     game = Game(max_depth=args.depth,
                 display_moves=args.display_moves,
                 colour=args.colour,
-                players=players)
-    game.run()
+                players=players,
+                table_size=args.table_size,
+                movetime=args.movetime,
+                backend=backend,
+                ponder=args.ponder,
+                book=Book(args.book) if args.book else None,
+                endgame_empties=args.endgame_empties,
+                stats=args.stats,
+                stats_file=stats_file,
+                headless=args.headless,
+                evaluator=evaluator)
+    try:
+        game.run()
+    finally:
+        if stats_file is not None:
+            stats_file.close()
 
 
 if __name__ == "__main__":
 
-    if RANK == 0:
+    args = parse_args()
+    evaluator = make_evaluator(args.evaluation, args.weights)
+    backend = select_backend(args.backend, args.workers, args.table_size, evaluator)
+
+    if backend.is_worker():
+        # WORKER
+        backend.run_worker()
+    else:
         # MAIN
         t_start = datetime.now()
 
-        main()
+        try:
+            main(args, backend, evaluator)
+        finally:
+            backend.shutdown()
 
         duration = datetime.now() - t_start
         print(f'Finished in {duration}')
-    else:
-        # WORKER
-        while True:
-            req = COMM.irecv(source=0, tag=1)
-            data = req.wait()
-            if data == -1:
-                break
-
-            # execute alpha_beta
-            score = AlphaBetaPruner.alpha_beta(current_state=data['next_state'], depth=data['depth'],
-                                               max_depth=data['max_depth'], alpha=data['alpha'], beta=data['beta'])
-
-            # print(f'Worker {RANK} received a message {data} - {score}')
-            req = COMM.isend((data['order'], score), dest=0, tag=1)
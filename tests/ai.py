@@ -1,5 +1,9 @@
+from game import bitboard
 from game.board import Board
 from game.controllers import AiController
+from game.ai import AlphaBetaPruner
+from game.book import start_state
+from game.position import Position
 from game.settings import *
 
 import unittest
@@ -45,5 +49,45 @@ class TestAi(unittest.TestCase):
         #self.assertEqual(, )
         self.assertIn(move, [p.get_position() for p in b.get_move_pieces(WHITE)])
 
+    def testIterativeDeepening(self):
+        b = Board(False)
+        b.set_black(4, 3)
+        b.set_black(3, 4)
+        b.set_white(4, 4)
+        b.set_white(3, 3)
+
+        pruner = AlphaBetaPruner(None, 64, b.pieces, BLACK, movetime=0.2)
+        move = pruner.run()
+
+        self.assertIn(move, [p.get_position() for p in b.get_move_pieces(BLACK)])
+        self.assertEqual(bitboard.to_coordinates(pruner.pv[0]), move)
+        self.assertGreater(len(pruner.pv), 1)
+
+    def testPrincipalVariationSearch(self):
+        def negamax(position, depth, max_depth):
+            actions = position.actions()
+            if depth > max_depth or not actions:
+                return pruner.evaluate(position)
+            best = -float('inf')
+            for action in actions:
+                position.make(action)
+                best = max(best, -negamax(position, depth + 1, max_depth))
+                position.unmake()
+            return best
+
+        # The scouts and re-searches find the score of a search without pruning.
+        current_state = start_state()
+        for action in (37, 43, 34, 29, 20):
+            current_state = AlphaBetaPruner.next_state(current_state, action)
+        pruner = AlphaBetaPruner(None, 3, None, BLACK, state=current_state, endgame_empties=0)
+        score = pruner.pvsplit(Position(current_state), 0, -pruner.infinity, pruner.infinity, None)[0]
+        self.assertAlmostEqual(score, negamax(Position(current_state), 0, 3))
+
+    def testMoveOnFirstTile(self):
+        # Black c1 and white b1: black a1 is the only move, on tile 0, and ends the game.
+        for max_depth in (0, 3):
+            pruner = AlphaBetaPruner(None, max_depth, None, BLACK, state=(BLACK_ID, 1 << 2, 1 << 1))
+            self.assertEqual(pruner.run(), (0, 0))
+
 if __name__ == '__main__':
     unittest.main()
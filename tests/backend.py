@@ -0,0 +1,280 @@
+import concurrent.futures
+import os
+import sys
+import threading
+
+from game import bitboard
+from game.ai import AlphaBetaPruner, init_process, search_task
+from game.backend import SERIAL, Channel, SerialBackend, PoolBackend, MPIBackend, select_backend, MPI_ENVIRONMENT
+from game.book import start_state
+from game.position import Position
+from game.settings import *
+
+import unittest
+
+
+class FakeMPI(object):
+    """The constants of mpi4py.MPI used by Channel."""
+
+    BYTE = 'B'
+    ANY_SOURCE = -1
+
+
+class FakeComm(object):
+    """A communicator of ranks in threads of one process, every rank has a mailbox of (source, tag, bytes)."""
+
+    def __init__(self, rank, mailboxes, condition):
+        self.rank = rank
+        self.mailboxes = mailboxes
+        self.condition = condition
+
+    @staticmethod
+    def world(size):
+        """ Returns the communicators of 'size' ranks.
+        """
+        mailboxes, condition = [[] for _ in range(size)], threading.Condition()
+        return [FakeComm(rank, mailboxes, condition) for rank in range(size)]
+
+    def Get_rank(self):
+        return self.rank
+
+    def Get_size(self):
+        return len(self.mailboxes)
+
+    def Send(self, message, dest, tag):
+        with self.condition:
+            self.mailboxes[dest].append((self.rank, tag, bytes(message[0])))
+            self.condition.notify_all()
+
+    def find(self, source, tag):
+        for i, (source_, tag_, _) in enumerate(self.mailboxes[self.rank]):
+            if tag_ == tag and source in (source_, FakeMPI.ANY_SOURCE):
+                return i
+        return None
+
+    def Recv(self, message, source, tag):
+        with self.condition:
+            self.condition.wait_for(lambda: self.find(source, tag) is not None)
+            message[0][:] = self.mailboxes[self.rank].pop(self.find(source, tag))[2]
+
+    def Iprobe(self, source, tag):
+        with self.condition:
+            return self.find(source, tag) is not None
+
+
+class FakeMPIBackend(MPIBackend):
+    """The MPI backend of a rank of a FakeComm."""
+
+    def __init__(self, comm, table_size=1000, evaluator=None):
+        self.comm = comm
+        self.rank = comm.Get_rank()
+        self.size = comm.Get_size()
+        self.table_size = table_size
+        self.evaluator = evaluator
+        self.channel = Channel(comm, FakeMPI)
+
+
+class ScriptedChannel(object):
+    """Records the tasks and aborts of mpi_split, the first task sent gets 'score' and the others are aborted."""
+
+    def __init__(self, score):
+        self.score = score
+        self.tasks = []
+        self.aborts = []
+        self.answered = 0
+
+    def send_task(self, rank, task_id, current_state, *args):
+        self.tasks.append((rank, task_id, current_state))
+
+    def send_abort(self, rank, task_id):
+        self.aborts.append((rank, task_id))
+
+    def recv_result(self):
+        task_id = self.tasks[self.answered][1]
+        score = self.score if self.answered == 0 else None
+        self.answered += 1
+        return task_id, score, 1, 0, 0, False
+
+
+class ScriptedBackend(SerialBackend):
+    """Hands the young brothers to a ScriptedChannel as if it had 'size' ranks."""
+
+    name = 'mpi'
+
+    def __init__(self, size, channel):
+        self.size = size
+        self.channel = channel
+
+    def splitter(self, pruner):
+        return pruner.mpi_split
+
+
+class ScriptedExecutor(object):
+    """Answers the tasks of pool_split with the next of 'scores', a None score waits for the abort event."""
+
+    def __init__(self, scores, abort):
+        self.scores = list(scores)
+        self.abort = abort
+        self.tasks = []
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        self.tasks.append((args, future))
+        score = self.scores.pop(0)
+        if score is None:
+            threading.Thread(target=self.aborted, args=(future,)).start()
+        else:
+            future.set_result((score, 1, 0, 0, 1))
+        return future
+
+    def aborted(self, future):
+        self.abort.wait()
+        future.set_result((None, 1, 0, 0, 2))
+
+
+class ScriptedPoolBackend(SerialBackend):
+    """Hands the young brothers to a ScriptedExecutor as if it had 'size' workers."""
+
+    name = 'pool'
+
+    def __init__(self, size, scores):
+        self.size = size
+        self.abort = threading.Event()
+        self.executor = ScriptedExecutor(scores, self.abort)
+
+    def splitter(self, pruner):
+        return pruner.pool_split
+
+
+class TestBackend(unittest.TestCase):
+    def setUp(self):
+        self.environment = {variable: os.environ.pop(variable) for variable in MPI_ENVIRONMENT
+                            if variable in os.environ}
+
+    def tearDown(self):
+        os.environ.update(self.environment)
+
+    def test_serial(self):
+        backend = select_backend('auto', 1)
+        self.assertIs(backend, SERIAL)
+        self.assertFalse(backend.is_worker())
+        self.assertNotIn('mpi4py', sys.modules)
+
+        pruner = AlphaBetaPruner(None, 2, None, BLACK, state=start_state())
+        self.assertEqual(pruner.split, pruner.serial_split)
+
+    def test_pool(self):
+        backend = select_backend('auto', 2)
+        try:
+            self.assertIsInstance(backend, PoolBackend)
+            self.assertNotIn('mpi4py', sys.modules)
+
+            pruner = AlphaBetaPruner(None, 3, None, BLACK, backend=backend, state=start_state())
+            self.assertEqual(pruner.split, pruner.pool_split)
+            serial = AlphaBetaPruner(None, 3, None, BLACK, state=start_state())
+            self.assertEqual(pruner.run(), serial.run())
+        finally:
+            backend.shutdown()
+
+    def test_pool_cutoff(self):
+        backend = ScriptedPoolBackend(2, [0.5, 0.2, 2.0, None])
+        pruner = AlphaBetaPruner(None, 2, None, BLACK, backend=backend, state=start_state())
+        position = pruner.make_position(start_state())
+        actions = position.actions()
+
+        # Two tasks at a time, the last two get the alpha of the first results.
+        self.assertEqual(pruner.pool_split(position, actions, 0, 0.0, 1.0, None), (2.0, actions[2]))
+        self.assertEqual([args[4] for args, _ in backend.executor.tasks], [0.0, 0.0, 0.5, 0.5])
+        # The task still running was aborted and waited for.
+        self.assertTrue(all(future.done() for _, future in backend.executor.tasks))
+        self.assertFalse(backend.abort.is_set())
+
+    def test_pool_abort(self):
+        abort = threading.Event()
+        init_process(1000, None, abort)
+        abort.set()
+        score = search_task(start_state(), Position(start_state()).key, 1, 20, -1e9, 1e9, 0, None)[0]
+        self.assertIsNone(score)
+
+    def test_messages(self):
+        master, worker = [Channel(comm, FakeMPI) for comm in FakeComm.world(2)]
+        current_state = start_state()
+
+        master.send_task(1, 7, current_state, 1 << 63, 2, 5, 8, -1.5, 1e400, None)
+        self.assertEqual(worker.recv_task(), (7, current_state, 1 << 63, 2, 5, 8, -1.5, 1e400, None))
+        master.send_task(1, 8, current_state, 0, 1, 1, 0, 0.0, 1e-6, 1234.5)
+        self.assertEqual(worker.recv_task()[-1], 1234.5)
+        # Depths above 255, such as the default max depth of Game.
+        master.send_task(1, 9, current_state, 0, 300, 1000, 64, 0.0, 1e-6, None)
+        self.assertEqual(worker.recv_task()[3:6], (300, 1000, 64))
+        master.send_stop(1)
+        self.assertEqual(worker.recv_task()[0], STOP_MESSAGE)
+
+        worker.send_result(7, 12.5, 100, 3, 2, False)
+        self.assertEqual(master.recv_result(), (7, 12.5, 100, 3, 2, False))
+        # An aborted task has no score.
+        worker.send_result(8, None, 10, 0, 0, True)
+        self.assertEqual(master.recv_result(), (8, None, 10, 0, 0, True))
+
+        self.assertIsNone(worker.poll_abort())
+        master.send_abort(1, 9)
+        self.assertEqual(worker.poll_abort(), 9)
+        self.assertIsNone(worker.poll_abort())
+
+    def test_mpi(self):
+        comms = FakeComm.world(4)
+        workers = [threading.Thread(target=FakeMPIBackend(comm).run_worker) for comm in comms[1:]]
+        for worker in workers:
+            worker.start()
+        backend = FakeMPIBackend(comms[0])
+        try:
+            current_state = start_state()
+            for action in (37, 43, 34):
+                current_state = AlphaBetaPruner.next_state(current_state, action)
+            for depth in (1, 3):
+                pruner = AlphaBetaPruner(None, depth, None, BLACK, backend=backend, state=current_state)
+                self.assertEqual(pruner.split, pruner.mpi_split)
+                serial = AlphaBetaPruner(None, depth, None, BLACK, state=current_state)
+                self.assertEqual(pruner.run(), serial.run())
+
+            # The tasks still running when the time is up are aborted.
+            pruner = AlphaBetaPruner(None, 64, None, BLACK, movetime=0.2, backend=backend, state=current_state)
+            moves = [bitboard.to_coordinates(tile) for tile in AlphaBetaPruner.actions(current_state)]
+            self.assertIn(pruner.run(), moves)
+        finally:
+            backend.shutdown()
+            for worker in workers:
+                worker.join(10)
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+
+    def test_mpi_cutoff(self):
+        channel = ScriptedChannel(score=2.0)
+        pruner = AlphaBetaPruner(None, 2, None, BLACK, backend=ScriptedBackend(4, channel), state=start_state())
+        position = pruner.make_position(start_state())
+        actions = position.actions()
+
+        score, action = pruner.mpi_split(position, actions, 0, 0.0, 1.0, None)
+        self.assertEqual(score, 2.0)
+        # The cutoff aborts the two other running tasks, and the last move is never sent.
+        self.assertEqual(len(channel.tasks), 3)
+        self.assertEqual(channel.aborts, [(rank, task_id) for rank, task_id, _ in channel.tasks[1:]])
+        self.assertEqual(AlphaBetaPruner.next_state(start_state(), action), channel.tasks[0][2])
+        self.assertEqual(position.state(), start_state())
+
+    def test_mpi_home_ranks(self):
+        # From the start position the homes on 2 ranks are d3: 2, c4: 1, f5: 1 and e6: 2.
+        channel = ScriptedChannel(score=-1.0)
+        pruner = AlphaBetaPruner(None, 2, None, BLACK, backend=ScriptedBackend(3, channel), state=start_state())
+        position = pruner.make_position(start_state())
+        pruner.mpi_split(position, position.actions(), 0, 0.0, 1.0, None)
+
+        self.assertEqual(len(channel.tasks), 4)
+        for rank, _, current_state in channel.tasks:
+            self.assertEqual(rank, 1 + Position(current_state).key % 2)
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, select_backend, 'threads')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+from game import bitboard
+from game.board import Board
+from game.settings import *
+
+import unittest
+
+
+class TestBitboard(unittest.TestCase):
+    def setUp(self):
+        self.own = (1 << bitboard.to_tile((4, 3))) | (1 << bitboard.to_tile((3, 4)))
+        self.opp = (1 << bitboard.to_tile((3, 3))) | (1 << bitboard.to_tile((4, 4)))
+
+    def test_initial_moves(self):
+        moves = [bitboard.to_coordinates(t) for t in bitboard.tiles(bitboard.get_moves(self.own, self.opp))]
+        self.assertEqual(moves, [(3, 2), (2, 3), (5, 4), (4, 5)])
+
+    def test_flips(self):
+        flips = bitboard.get_flips(self.own, self.opp, bitboard.to_tile((3, 2)))
+        self.assertEqual(bitboard.tiles(flips), [bitboard.to_tile((3, 3))])
+
+    def test_no_wrap_around(self):
+        # An opponent disc on the h-file followed by an own disc on the a-file of the next row.
+        own = 1 << bitboard.to_tile((0, 1))
+        opp = 1 << bitboard.to_tile((7, 0))
+        self.assertEqual(bitboard.get_moves(own, opp), 0)
+
+    def test_same_moves_as_board(self):
+        b = Board(False)
+        b.set_white(3, 2)
+        b.set_white(4, 1)
+        b.set_white(4, 2)
+        b.set_white(6, 3)
+        b.set_black(1, 3)
+        b.set_black(2, 3)
+        b.set_black(3, 3)
+        b.set_black(4, 3)
+        b.set_black(7, 0)
+
+        state = [WHITE_ID if p.get_state() == WHITE else BLACK_ID if p.get_state() == BLACK else BOARD_ID
+                 for p in b.pieces]
+        own, opp = bitboard.from_list(state, WHITE_ID, BLACK_ID)
+        moves = [bitboard.to_coordinates(t) for t in bitboard.tiles(bitboard.get_moves(own, opp))]
+
+        self.assertEqual(sorted(moves), sorted(p.get_position() for p in b.get_move_pieces(WHITE)))
+
+    def test_count(self):
+        self.assertEqual(bitboard.count(bitboard.CORNERS), 4)
+        self.assertEqual(bitboard.count(bitboard.EDGES), 28)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -355,5 +355,47 @@ class TestBoard(unittest.TestCase):
 
         #b.make_move()
 
+    def test_make_move_edges(self):
+        b = Board(False)
+        b.set_white(6, 0)
+        b.set_white(7, 0)
+        b.set_white(5, 1)
+        b.set_black(0, 1)
+        b.set_black(5, 2)
+
+        b.make_move((5, 0), BLACK)
+        result = b.draw()
+        canvas = """  a.b.c.d.e.f.g.h.
+1 ..........BBWWWW1
+2 BB........BB....2
+3 ..........BB....3
+4 ................4
+5 ................5
+6 ................6
+7 ................7
+8 ................8
+  a.b.c.d.e.f.g.h."""
+        self.assertEqual(result, canvas)
+
+    def test_cached_moves(self):
+        b = Board(False)
+        b.set_white(3, 3)
+        b.set_white(4, 4)
+        b.set_black(3, 4)
+        b.set_black(4, 3)
+
+        moves = b.legal_moves(BLACK)
+        self.assertIs(b.legal_moves(BLACK), moves)
+        self.assertEqual(len(b.get_move_pieces(BLACK)), 4)
+
+        # The pieces are views of the board, changing one changes the moves.
+        b.pieces[3 + 3 * WIDTH].flip()
+        self.assertEqual(b.get_state(3, 3), BLACK)
+        self.assertEqual(len(b.get_move_pieces(BLACK)), 3)
+
+        b.make_move((5, 4), BLACK)
+        self.assertNotEqual(b.legal_moves(BLACK), moves)
+        self.assertRaises(ValueError, b.make_move, (5, 4), WHITE)
+
 if __name__ == '__main__':
     unittest.main()
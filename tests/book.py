@@ -0,0 +1,73 @@
+from game import bitboard
+from game import book
+from game.position import Position
+from game.settings import *
+
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestBook(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'book.bin')
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.path))
+
+    def test_canonical(self):
+        _, own, opp = book.start_state()
+        position = Position(book.start_state())
+        keys = set()
+        for action in position.actions():
+            position.make(action)
+            keys.add(book.canonical(position.own, position.opp)[:2])
+            position.unmake()
+
+        # The four first moves are all the same move up to symmetry.
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(book.canonical(own, opp)[:2], book.canonical(opp, own)[:2])
+
+    def test_lookup(self):
+        records = {}
+        start = book.start_state()
+        book.add_record(records, start, bitboard.to_tile((3, 2)), 1.0)
+        book.write_records(self.path, records)
+
+        b = book.Book(self.path)
+        self.assertEqual(len(b), 1)
+        self.assertIn(b.lookup(start), [(3, 2), (2, 3), (5, 4), (4, 5)])
+        self.assertEqual(b.lookup((BLACK_ID, 1, 2)), None)
+        b.close()
+
+    def test_symmetric_lookup(self):
+        position = Position(book.start_state())
+        position.make(bitboard.to_tile((3, 2)))
+        records = {}
+        book.add_record(records, position.state(), bitboard.to_tile((2, 2)), 0.0)
+        book.write_records(self.path, records)
+        position.unmake()
+
+        # The mirrored opening gets the mirrored reply.
+        position.make(bitboard.to_tile((4, 5)))
+        b = book.Book(self.path)
+        self.assertEqual(b.lookup(position.state()), (5, 5))
+        b.close()
+
+    def test_build_from_games(self):
+        self.assertEqual(book.build_from_games(self.path, ['f5d6c3', 'f5f6'], 2), 2)
+        b = book.Book(self.path)
+        self.assertEqual(b.lookup(book.start_state()), (5, 4))
+        b.close()
+
+    def test_build_from_tournament(self):
+        # The moves are the last column, and the skipped moves are left out.
+        line = 'depth=1\tdepth=2\t40\t24\t100\t200\tf5d6c3d3\n'
+        self.assertEqual(book.build_from_games(self.path, [line], 3, skip=1), 2)
+        b = book.Book(self.path)
+        self.assertIsNone(b.lookup(book.start_state()))
+        b.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from game import bitboard
+from game.ai import AlphaBetaPruner
+from game.board import Board
+from game.brain import Brain, Ponderer
+from game.book import start_state
+from game.settings import *
+from game.table import TranspositionTable
+
+import unittest
+
+
+class TestBrain(unittest.TestCase):
+    def setUp(self):
+        self.brain = Brain(2, BLACK)
+        self.brain.start()
+
+    def tearDown(self):
+        self.brain.stop()
+
+    def test_search(self):
+        current_state = start_state()
+        moves = [bitboard.to_coordinates(tile) for tile in bitboard.tiles(bitboard.get_moves(*current_state[1:]))]
+
+        # The same thread searches every move.
+        for _ in range(2):
+            self.brain.search(current_state)
+            self.assertIn(self.brain.result(timeout=10), moves)
+        self.assertTrue(self.brain.is_alive())
+
+    def test_error(self):
+        self.brain.search((BLACK_ID, 0, 0))
+        self.assertRaises(Exception, self.brain.result, 10)
+        self.assertTrue(self.brain.is_alive())
+
+
+class TestPonderer(unittest.TestCase):
+    def setUp(self):
+        # Black to move, the ponderer plays white.
+        self.board = Board(False)
+        self.board.set_black(4, 3)
+        self.board.set_black(3, 4)
+        self.board.set_white(4, 4)
+        self.board.set_white(3, 3)
+
+    def test_results(self):
+        ponderer = Ponderer(1, self.board.pieces, WHITE, TranspositionTable())
+        ponderer.start()
+        ponderer.join(30)
+
+        # Every black move has a reply, keyed by the state after the move.
+        current_state = start_state()
+        states = [AlphaBetaPruner.next_state(current_state, tile) for tile in AlphaBetaPruner.actions(current_state)]
+        self.assertEqual(set(ponderer.results), set(states))
+        for state in states:
+            replies = [bitboard.to_coordinates(tile) for tile in AlphaBetaPruner.actions(state)]
+            self.assertIn(ponderer.results[state], replies)
+
+    def test_stop(self):
+        ponderer = Ponderer(20, self.board.pieces, WHITE, TranspositionTable())
+        ponderer.start()
+        time.sleep(0.2)
+        start = time.time()
+        ponderer.stop()
+        self.assertLess(time.time() - start, 1)
+        self.assertFalse(ponderer.is_alive())
+        self.assertEqual(ponderer.results, {})
+
+    def test_aborted(self):
+        pruner = AlphaBetaPruner(None, 20, None, BLACK, state=start_state())
+        pruner.stop_event = threading.Event()
+        threading.Timer(0.2, pruner.stop_event.set).start()
+        start = time.time()
+        self.assertRaises(SearchAborted, pruner.run)
+        self.assertLess(time.time() - start, 1.2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import contextlib
+import io
+
+from game.ai import AlphaBetaPruner
+from game.board import Board
+from game.controllers import AiController
+from game.settings import *
+
+import unittest
+
+
+def start_board():
+    board = Board(False)
+    board.set_black(4, 3)
+    board.set_black(3, 4)
+    board.set_white(4, 4)
+    board.set_white(3, 3)
+    return board
+
+
+class TestAiController(unittest.TestCase):
+    def test_headless(self):
+        board = start_board()
+        for headless in (False, True):
+            ai = AiController(1, BLACK, 2, headless=headless)
+            out = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(out):
+                    move = ai.next_move(board)
+            finally:
+                ai.close()
+            self.assertIn(move, [p.get_position() for p in board.get_move_pieces(BLACK)])
+            self.assertEqual(out.getvalue() == '', headless)
+
+    def test_pondered_move(self):
+        board = start_board()
+        ai = AiController(1, WHITE, 1, headless=True)
+        ai.start_pondering(board)
+        ai.ponderer.join(30)
+        board.make_move((5, 4), BLACK)
+        ai.stop_pondering()
+
+        # The reply to the move black played is returned without a search.
+        state = AlphaBetaPruner.pieces_state(board.pieces, WHITE_ID)
+        self.assertIn(state, ai.pondered)
+        reply = ai.pondered[state]
+        self.assertEqual(ai.next_move(board), reply)
+        self.assertIsNone(ai.brain)
+        self.assertEqual(ai.pondered, {})
+        ai.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import random
+
+from game import bitboard
+from game.ai import AlphaBetaPruner
+from game.book import start_state
+from game.endgame import EndgameSolver, DISC_SCORE
+from game.position import Position
+from game.settings import *
+
+import unittest
+
+
+def minimax(own, opp, passed=False):
+    """ Returns the final disc difference for the player owning 'own' by searching every line.
+    """
+    moves = bitboard.get_moves(own, opp)
+    if not moves:
+        if passed:
+            return EndgameSolver.final_score(own, opp)
+        return -minimax(opp, own, True)
+
+    scores = []
+    for tile in bitboard.tiles(moves):
+        flips = bitboard.get_flips(own, opp, tile)
+        scores.append(-minimax(opp ^ flips, own | flips | (1 << tile)))
+    return max(scores)
+
+
+def random_state(empties, seed):
+    """ Returns a state reached by random moves from the start, with 'empties' empty tiles
+        and a move for the player to play.
+    """
+    r = random.Random(seed)
+    while True:
+        position = Position(start_state())
+        while position.empties > empties:
+            actions = position.actions()
+            if not actions:
+                position.make_pass()
+                if not position.actions():
+                    break
+                continue
+            position.make(r.choice(actions))
+        if position.empties == empties and position.actions():
+            return position.state()
+
+
+class TestEndgame(unittest.TestCase):
+    def test_solve(self):
+        for seed in range(10):
+            _, own, opp = random_state(7, seed)
+            solver = EndgameSolver()
+            score = minimax(own, opp)
+            self.assertEqual(solver.solve(own, opp), score)
+            self.assertEqual(solver.best_move(own, opp)[0], score)
+            self.assertEqual(solver.win_loss_draw(own, opp), (score > 0) - (score < 0))
+            self.assertEqual(solver.winning_move(own, opp)[0], (score > 0) - (score < 0))
+
+    def test_bounds(self):
+        _, own, opp = random_state(7, 0)
+        score = minimax(own, opp)
+        solver = EndgameSolver()
+        self.assertGreaterEqual(solver.solve(own, opp, score, score + 10), score)
+        self.assertLessEqual(solver.solve(own, opp, score - 10, score), score)
+
+    def test_final_score(self):
+        own = bitboard.FULL >> 24
+        opp = bitboard.FULL ^ own
+        self.assertEqual(EndgameSolver.final_score(own, opp), 40 - 24)
+        # Empty tiles go to the winner.
+        self.assertEqual(EndgameSolver.final_score(own & ~1, opp), 39 - 24 + 1)
+        self.assertEqual(EndgameSolver.final_score(opp, own & ~1), 24 - 39 - 1)
+
+    def test_pruner(self):
+        current_state = random_state(8, 3)
+        player, own, opp = current_state
+        pruner = AlphaBetaPruner(None, 5, None, WHITE if player == WHITE_ID else BLACK, state=current_state,
+                                 endgame_empties=8)
+        move = bitboard.to_tile(pruner.run())
+        flips = bitboard.get_flips(own, opp, move)
+        self.assertEqual(-minimax(opp ^ flips, own | flips | (1 << move)), minimax(own, opp))
+
+        # alpha_beta scores for the player to move, the opponent of the player who made the move.
+        position = Position(current_state)
+        position.make(move)
+        score = pruner.alpha_beta(position, 1, -pruner.infinity, pruner.infinity)
+        self.assertEqual(-score, DISC_SCORE * minimax(own, opp))
+
+    def test_win_loss_draw_pruner(self):
+        # Above the exact solve the pruner plays a move keeping the result of the position,
+        # a search of depth 1 plays a worse move in these positions.
+        for seed in (13, 18, 28, 45):
+            current_state = random_state(11, seed)
+            player, own, opp = current_state
+            solver = EndgameSolver()
+            pruner = AlphaBetaPruner(None, 1, None, WHITE if player == WHITE_ID else BLACK, state=current_state,
+                                     endgame_empties=8)
+            move = bitboard.to_tile(pruner.run())
+            flips = bitboard.get_flips(own, opp, move)
+            self.assertEqual(-solver.win_loss_draw(opp ^ flips, own | flips | (1 << move)),
+                             solver.win_loss_draw(own, opp))
+
+if __name__ == '__main__':
+    unittest.main()
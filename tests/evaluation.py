@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+from game import bitboard
+from game.book import start_state
+from game.evaluation import DEFAULT_WEIGHTS, TableEvaluator, load_weights, write_weights, symmetric_squares
+from game.position import Position
+from game.settings import *
+
+import unittest
+
+
+def table_score(weights, position):
+    """ Returns the score of the table evaluation by walking over every square.
+    """
+    phase = next(p for p in weights['phases'] if p['empties'][0] <= position.empties <= p['empties'][1])
+    score = 0
+    for tile in range(WIDTH * HEIGHT):
+        if position.own >> tile & 1:
+            score += phase['squares'][tile]
+        elif position.opp >> tile & 1:
+            score -= phase['squares'][tile]
+    moves = bitboard.count(bitboard.get_moves(position.own, position.opp)) - \
+        bitboard.count(bitboard.get_moves(position.opp, position.own))
+    return score + phase['mobility'] * moves
+
+
+class TestEvaluation(unittest.TestCase):
+    def test_symmetric(self):
+        squares = symmetric_squares(range(10))
+        self.assertEqual(squares[0], squares[7])
+        self.assertEqual(squares[0], squares[63])
+        self.assertEqual(squares[1], squares[8])
+        self.assertEqual(squares[9], squares[54])
+        self.assertEqual(squares[27], 9)
+
+    def test_table(self):
+        evaluator = TableEvaluator()
+        position = Position(start_state())
+        for tile in (37, 43, 34, 29, 20, 21, 42):
+            position.make(tile)
+            self.assertEqual(evaluator.evaluate(position), table_score(DEFAULT_WEIGHTS, position))
+
+        # The score is for the player to move.
+        score = evaluator.evaluate(position)
+        position.make_pass()
+        self.assertEqual(evaluator.evaluate(position), -score)
+
+    def test_weight_file(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            write_weights(path, DEFAULT_WEIGHTS)
+            self.assertEqual(load_weights(path), DEFAULT_WEIGHTS)
+        finally:
+            os.remove(path)
+
+    def test_phases(self):
+        phases = DEFAULT_WEIGHTS['phases']
+        self.assertRaises(ValueError, TableEvaluator, {'phases': phases[:2]})
+        self.assertRaises(ValueError, TableEvaluator, {'phases': phases + phases[:1]})
+        self.assertRaises(ValueError, TableEvaluator, {'phases': [{'empties': [0, 64], 'squares': [1],
+                                                                   'mobility': 0}]})
+
+if __name__ == '__main__':
+    unittest.main()
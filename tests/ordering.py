@@ -0,0 +1,36 @@
+from game.ai import AlphaBetaPruner
+from game.book import start_state
+from game.ordering import MoveOrdering
+from game.settings import *
+
+import unittest
+
+
+class TestOrdering(unittest.TestCase):
+    def test_static(self):
+        ordering = MoveOrdering()
+        # b2 (an X-square) last, a1 (a corner) first.
+        self.assertEqual(ordering.order([9, 0, 2, 19], 0, BLACK_ID), [0, 2, 19, 9])
+
+    def test_order(self):
+        ordering = MoveOrdering()
+        ordering.cutoff(19, 3, 2, BLACK_ID)
+        ordering.cutoff(26, 3, 0, BLACK_ID)
+        ordering.cutoff(44, 4, 4, BLACK_ID)
+
+        # The table move, then the killers of the ply, newest first, then by history.
+        self.assertEqual(ordering.order([0, 19, 26, 44, 37], 3, BLACK_ID, 37), [37, 26, 19, 44, 0])
+        self.assertEqual(ordering.order([0, 19, 26, 44], 3, WHITE_ID), [26, 19, 0, 44])
+        self.assertEqual(ordering.order([0, 19, 26, 44], 4, BLACK_ID), [44, 19, 26, 0])
+
+        ordering.cutoff(11, 3, 0, BLACK_ID)
+        self.assertEqual(ordering.killers[3], [11, 26])
+
+    def test_iterations(self):
+        # The ordering is kept from one iteration to the next.
+        pruner = AlphaBetaPruner(None, 3, None, BLACK, movetime=10, state=start_state())
+        pruner.run()
+        self.assertTrue(any(any(history) for history in pruner.ordering.history.values()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import random
+import tempfile
+
+from game.book import start_state
+from game.evaluation import DEFAULT_WEIGHTS, TableEvaluator, symmetric_squares
+from game.patterns import PatternEvaluator, PATTERNS, TILE_DIGITS, indices, pattern_tables, read_patterns, \
+    write_patterns
+from game.position import Position
+from game.settings import *
+
+import unittest
+
+
+def colours(position):
+    return (position.own, position.opp) if position.player == BLACK_ID else (position.opp, position.own)
+
+
+class TestPatterns(unittest.TestCase):
+    def test_instances(self):
+        edges = dict(PATTERNS)['edge']
+        self.assertEqual(edges[0], tuple(range(WIDTH)))
+        self.assertEqual(edges[3], tuple(WIDTH - 1 + WIDTH * y for y in range(HEIGHT)))
+        self.assertEqual(dict(PATTERNS)['corner'][3][0], WIDTH * HEIGHT - 1)
+
+    def test_coverage(self):
+        self.assertTrue(all(TILE_DIGITS))
+        self.assertEqual(dict(PATTERNS)['block'][0], (11, 12, 19, 20))
+
+    def test_table_weights(self):
+        # Weights shared out evenly between the instances of a square score like the table evaluator.
+        weights = {'phases': [{'empties': [0, 64], 'mobility': 0, 'squares': symmetric_squares(
+            [12 * w for w in (40, -10, 5, 2, -20, -1, -1, 0, 1, 3)])}]}
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        write_patterns(path, pattern_tables(weights))
+        try:
+            evaluator, table = PatternEvaluator(path), TableEvaluator(weights)
+            r = random.Random(7)
+            position = Position(start_state())
+            while position.actions():
+                position.make(r.choice(position.actions()))
+                self.assertEqual(evaluator.evaluate(position), table.evaluate(position))
+            del evaluator
+        finally:
+            os.remove(path)
+
+    def test_incremental(self):
+        r = random.Random(5)
+        evaluator = PatternEvaluator()
+        position = Position(start_state())
+        evaluator.attach(position)
+
+        made = []
+        while True:
+            actions = position.actions()
+            if not actions:
+                break
+            made.append((position.patterns.indices[:], colours(position)))
+            position.make(r.choice(actions))
+            self.assertEqual(position.patterns.indices, indices(*colours(position)))
+
+        for expected, discs in reversed(made):
+            position.unmake()
+            self.assertEqual(colours(position), discs)
+            self.assertEqual(position.patterns.indices, expected)
+
+    def test_evaluate(self):
+        evaluator = PatternEvaluator()
+        position = Position(start_state())
+        for tile in (37, 43, 34, 29, 20, 21, 42):
+            position.make(tile)
+        # Without the indices the evaluator computes them.
+        score = evaluator.evaluate(position)
+        evaluator.attach(position)
+        self.assertEqual(evaluator.evaluate(position), score)
+        position.make_pass()
+        self.assertEqual(evaluator.evaluate(position), -score)
+
+    def test_file(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            write_patterns(path, pattern_tables(DEFAULT_WEIGHTS))
+            evaluator = PatternEvaluator(path)
+            position = Position(start_state())
+            position.make(37)
+            self.assertEqual(evaluator.evaluate(position), PatternEvaluator().evaluate(position))
+            # A black disc on b1 alone, b1 is in an edge and a corner block.
+            self.assertEqual(evaluator.by_empties[0][0][3], round(DEFAULT_WEIGHTS['phases'][2]['squares'][1] / 2))
+            del evaluator
+        finally:
+            os.remove(path)
+
+    def test_bad_file(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            phases = pattern_tables(DEFAULT_WEIGHTS)
+            write_patterns(path, phases)
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.assertEqual(len(read_patterns(data)), len(phases))
+            self.assertRaises(ValueError, read_patterns, data[:-2])
+            self.assertRaises(ValueError, read_patterns, data[:10])
+
+            # Overlapping phases, and a phase beyond the board.
+            for ranges in (((45, 64), (20, 45), (0, 19)), ((45, 65), (20, 44), (0, 19))):
+                write_patterns(path, [(r, tables) for r, (_, tables) in zip(ranges, phases)])
+                self.assertRaises(ValueError, PatternEvaluator, path)
+        finally:
+            os.remove(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+from game.perft import CORPUS, PATHS, perft
+
+import unittest
+
+
+class TestPerft(unittest.TestCase):
+    def test_paths(self):
+        for name, current_state, counts in CORPUS:
+            for path in PATHS:
+                self.assertEqual(perft(current_state, 3, path), counts[3], (name, path))
+
+    def test_deep(self):
+        for name, current_state, counts in CORPUS:
+            depth = 6 if name != 'opening' else 5
+            self.assertEqual(perft(current_state, depth), counts[depth], name)
+
+    def test_passes(self):
+        _, current_state, counts = CORPUS[-1]
+        self.assertEqual(perft(current_state, 8, 'pruner'), counts[8])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+from game import bitboard
+from game.position import Position
+from game.settings import *
+from game.table import hash_state
+
+import unittest
+
+
+class TestPosition(unittest.TestCase):
+    def setUp(self):
+        own = (1 << bitboard.to_tile((4, 3))) | (1 << bitboard.to_tile((3, 4)))
+        opp = (1 << bitboard.to_tile((3, 3))) | (1 << bitboard.to_tile((4, 4)))
+        self.state = (BLACK_ID, own, opp)
+
+    def test_make(self):
+        p = Position(self.state)
+        p.make(bitboard.to_tile((3, 2)))
+        player, own, opp = p.state()
+
+        self.assertEqual(player, WHITE_ID)
+        self.assertEqual(bitboard.count(own), 1)
+        self.assertEqual(bitboard.count(opp), 4)
+        self.assertEqual(p.key, hash_state(p.state()))
+
+    def test_unmake(self):
+        p = Position(self.state)
+        key = p.key
+        moves = []
+        while p.actions() and len(moves) < 10:
+            moves.append(p.actions()[-1])
+            p.make(moves[-1])
+
+        for _ in moves:
+            p.unmake()
+
+        self.assertEqual(p.state(), self.state)
+        self.assertEqual(p.key, key)
+        self.assertEqual(p.ply, 0)
+
+    def test_running_terms(self):
+        p = Position(self.state)
+        while p.actions() and p.ply < 20:
+            p.make(p.actions()[p.ply % len(p.actions())])
+            fresh = Position(p.state())
+            self.assertEqual((p.discs, p.corners, p.edges, p.weights),
+                             (fresh.discs, fresh.corners, fresh.edges, fresh.weights))
+            self.assertEqual(p.evaluation(WHITE_ID), -p.evaluation(BLACK_ID))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import io
+
+from game.board import Board
+from game.render import Renderer, CLEAR_SCREEN, move_cursor
+from game.settings import *
+
+import unittest
+
+
+class TestRender(unittest.TestCase):
+    def setUp(self):
+        self.board = Board(False)
+        self.board.set_black(4, 3)
+        self.board.set_white(3, 3)
+        self.out = io.StringIO()
+        self.renderer = Renderer(False, self.out)
+
+    def frame(self, moves, info):
+        self.out.seek(0)
+        self.out.truncate()
+        self.renderer.draw(self.board, moves, info)
+        return self.out.getvalue()
+
+    def test_first_frame(self):
+        output = self.frame([(2, 3)], ['info'])
+        self.assertTrue(output.startswith(CLEAR_SCREEN))
+        self.assertIn('4 ....MMWWBB......4', output)
+        self.assertTrue(output.endswith('info\n'))
+
+    def test_changed_tiles(self):
+        self.frame([(2, 3)], [])
+        self.board.set_black(3, 3)
+        output = self.frame([], [])
+
+        self.assertNotIn(CLEAR_SCREEN, output)
+        self.assertIn(move_cursor(5, 3 + 2 * 3) + 'BB', output)
+        self.assertIn(move_cursor(5, 3 + 2 * 2) + '..', output)
+        self.assertEqual(output.count('\x1b['), 4)
+
+    def test_reset(self):
+        self.frame([], [])
+        self.renderer.reset()
+        self.assertTrue(self.frame([], []).startswith(CLEAR_SCREEN))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+
+from game.ai import AlphaBetaPruner
+from game.book import start_state
+from game.settings import *
+from game.stats import SearchStats
+
+import unittest
+
+
+class TestStats(unittest.TestCase):
+    def test_search(self):
+        stats = SearchStats()
+        pruner = AlphaBetaPruner(None, 3, None, BLACK, state=start_state(), stats=stats)
+        move = pruner.run()
+
+        self.assertEqual(stats.move, move)
+        self.assertEqual(stats.nodes, pruner.nodes)
+        self.assertEqual(stats.depth, 3)
+        self.assertGreater(stats.cutoffs, 0)
+        self.assertLessEqual(stats.first_cutoffs, stats.cutoffs)
+        self.assertEqual(len(stats.plies), 1)
+        self.assertEqual(stats.table, pruner.table.stats())
+        self.assertGreater(stats.hit_rate(), 0)
+
+    def test_iterative_deepening(self):
+        stats = SearchStats()
+        pruner = AlphaBetaPruner(None, 4, None, BLACK, movetime=10, state=start_state(), stats=stats)
+        pruner.run()
+
+        self.assertEqual([ply['depth'] for ply in stats.plies], [0, 1, 2, 3, 4])
+        self.assertEqual(sum(ply['nodes'] for ply in stats.plies), stats.nodes)
+        self.assertGreater(stats.branching_factor(), 1)
+
+    def test_json(self):
+        stats = SearchStats()
+        stats.add_ply(2, 100, 10, 8)
+        stats.add_task(1, 40)
+        stats.add_task(1, 20)
+        stats.add_table({'hits': 5, 'misses': 10, 'collisions': 1}, {'hits': 35, 'misses': 20, 'collisions': 4})
+        stats.finish((5, 4), 100, 10, 8)
+
+        record = json.loads(stats.to_json())
+        self.assertEqual(record['move'], 'f5')
+        self.assertEqual(record['ranks'], {'0': {'tasks': 1, 'nodes': 40}, '1': {'tasks': 2, 'nodes': 60}})
+        self.assertEqual(record['branching_factor'], 10)
+        self.assertEqual(record['table'], {'hits': 30, 'misses': 10, 'collisions': 3})
+        self.assertIn('75% hit rate', stats.report())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+from game.settings import *
+from game.table import TranspositionTable, EXACT, LOWER
+
+import unittest
+
+
+class TestTable(unittest.TestCase):
+    def test_probe(self):
+        table = TranspositionTable(16)
+        self.assertEqual(table.probe(5), None)
+        table.store(5, 3, EXACT, 1.5, 19)
+        self.assertEqual(table.probe(5), (5, 3, EXACT, 1.5, 19))
+        self.assertEqual(table.stats(), {'hits': 1, 'misses': 1, 'collisions': 0})
+
+    def test_replacement(self):
+        table = TranspositionTable(16)
+        self.assertEqual(table.size(), 16)
+
+        deep, shallow, newer = 1, 1 + 8, 1 + 16
+        table.store(deep, 5, EXACT, 1, 0)
+        table.store(shallow, 2, LOWER, 2, 0)
+        self.assertEqual(table.probe(deep)[1], 5)
+        self.assertEqual(table.probe(shallow)[1], 2)
+
+        # The always-replace slot gives way, the deeper entry stays.
+        table.store(newer, 1, LOWER, 3, 0)
+        self.assertEqual(table.probe(shallow), None)
+        self.assertEqual(table.probe(deep)[1], 5)
+        self.assertEqual(table.collisions, 1)
+
+if __name__ == '__main__':
+    unittest.main()
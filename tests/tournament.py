@@ -0,0 +1,57 @@
+import io
+
+from game.book import build_from_games
+from game.tournament import Engine, play_game, run_tournament, schedule
+
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestTournament(unittest.TestCase):
+    def test_engine(self):
+        engine = Engine('depth=2,movetime=0.5,endgame=10,table=1024')
+        self.assertEqual((engine.max_depth, engine.movetime, engine.endgame_empties, engine.table_size),
+                         (2, 0.5, 10, 1024))
+        self.assertRaises(ValueError, Engine, 'speed=2')
+
+    def test_schedule(self):
+        a, b = Engine('depth=1'), Engine('depth=2')
+        tasks = schedule([a, b], 4, 2, 0)
+        self.assertEqual([(t[0], t[1]) for t in tasks], [(a, b), (b, a), (a, b), (b, a)])
+        # Both colours play the same opening.
+        self.assertEqual(tasks[0][2], tasks[1][2])
+
+    def test_play_game(self):
+        engine = Engine('depth=1')
+        black_discs, white_discs, black_nodes, white_nodes, moves = play_game(engine, engine, 7, 4)
+        self.assertLessEqual(black_discs + white_discs, 64)
+        self.assertGreater(black_nodes, 0)
+        self.assertEqual(play_game(engine, engine, 7, 4)[4], moves)
+
+        # The moves can be read back as a self-play record.
+        directory = tempfile.mkdtemp()
+        try:
+            self.assertGreater(build_from_games(os.path.join(directory, 'book.bin'), [moves], 10), 0)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_run_tournament(self):
+        output = io.StringIO()
+        summary = run_tournament([Engine('depth=0'), Engine('depth=1')], 4, workers=2, output=output)
+        self.assertEqual(summary.games, 4)
+        self.assertEqual(len(output.getvalue().splitlines()), 4)
+        self.assertAlmostEqual(summary.win_rate('depth=0') + summary.win_rate('depth=1'), 1.0)
+
+        # The output can be learned as a book without its random moves.
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'book.bin')
+            self.assertGreater(build_from_games(path, output.getvalue().splitlines(), 6, skip=4), 0)
+        finally:
+            shutil.rmtree(directory)
+        self.assertIn('games/s', summary.report())
+
+if __name__ == '__main__':
+    unittest.main()
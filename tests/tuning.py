@@ -0,0 +1,103 @@
+import os
+import random
+import tempfile
+
+from game import bitboard
+from game.book import start_state
+from game.endgame import EndgameSolver
+from game.evaluation import TableEvaluator, load_weights, symmetric_squares
+from game.position import Position
+from game.settings import *
+from game.tournament import format_move
+
+import unittest
+
+try:
+    import numpy as np
+    from game import tuning
+except ImportError:
+    np = None
+
+
+def random_games(count, seed):
+    """ Returns the move records of random games.
+    """
+    r = random.Random(seed)
+    games = []
+    for _ in range(count):
+        position = Position(start_state())
+        moves = []
+        while True:
+            actions = position.actions()
+            if not actions:
+                position.make_pass()
+                if not position.actions():
+                    break
+                continue
+            tile = r.choice(actions)
+            moves.append(format_move(tile))
+            position.make(tile)
+        games.append(''.join(moves))
+    return games
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestTuning(unittest.TestCase):
+    def test_features(self):
+        # The features weighted by the table weights give the table evaluation.
+        classes = [500, -100, 50, 25, -250, -10, -10, -5, -5, 3]
+        evaluator = TableEvaluator({'phases': [{'empties': [0, 64], 'mobility': 7,
+                                                'squares': symmetric_squares(classes)}]})
+        positions, _ = tuning.replay(random_games(1, 0)[0])
+        x = tuning.features(np.array([p[0] for p in positions], dtype=np.uint64),
+                            np.array([p[1] for p in positions], dtype=np.uint64))
+        scores = x.astype(np.int64) @ np.array(classes + [7])
+
+        for (own, opp, _), score in zip(positions, scores):
+            self.assertEqual(evaluator.evaluate(Position((BLACK_ID, own, opp))), score)
+
+    def test_replay(self):
+        game = random_games(1, 1)[0]
+        positions, results = tuning.replay(game, skip=4)
+        self.assertEqual(positions[0][2], WIDTH * HEIGHT - 8)
+        # The final disc difference is the opposite for the two players.
+        self.assertEqual(abs(results[0]), abs(results[1]))
+        self.assertEqual(tuning.replay('a1' + game[2:])[0], None)
+
+        # The empty tiles of an unfinished record go to the player ahead, as in the exact scores.
+        position = Position(start_state())
+        for i in range(0, 40, 2):
+            if not position.actions():
+                position.make_pass()
+            position.make(bitboard.to_tile((ord(game[i]) - ord('a'), ord(game[i + 1]) - ord('1'))))
+        _, results = tuning.replay(game[:40])
+        self.assertEqual(abs(results[-1]), abs(EndgameSolver.final_score(position.own, position.opp)))
+        self.assertGreater(abs(results[-1]), position.empties)
+
+    def test_batches(self):
+        games = random_games(5, 2)
+        x, empties, results = tuning.load_dataset(games, batch=7)
+        y, _, _ = tuning.load_dataset(games)
+        self.assertTrue((x == y).all())
+        self.assertEqual(len(x), len(empties))
+        self.assertEqual(len(x), sum(len(tuning.replay(game)[0]) for game in games))
+
+    def test_fit(self):
+        x, _, _ = tuning.load_dataset(random_games(20, 3))
+        w = np.arange(tuning.FEATURES) % 3 - 1
+        results = (x.astype(np.int64) @ w).astype(np.int8)
+        fitted = tuning.fit_least_squares(x, results, ridge=0.0, batch=100)
+        self.assertTrue(np.allclose(fitted, w * tuning.DISC_SCORE))
+
+        weights, counts = tuning.tune(x, *tuning.load_dataset(random_games(20, 3))[1:], method='logistic')
+        self.assertEqual(sum(counts), len(x))
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            tuning.write_weights(path, weights)
+            TableEvaluator(load_weights(path))
+        finally:
+            os.remove(path)
+
+if __name__ == '__main__':
+    unittest.main()